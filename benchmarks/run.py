@@ -0,0 +1,290 @@
+"""
+Throughput benchmarks for the physics, photometry, color and rendering code.
+
+Run from the repository root:
+
+    python -m benchmarks.run                   # run everything, write benchmarks/results.json
+    python -m benchmarks.run -k doppler        # only scenarios whose name contains "doppler"
+    python -m benchmarks.run --save-baseline   # also store the results as benchmarks/baseline.json
+
+Every run is compared against the stored baseline (if any); results more than --tolerance worse
+are reported as regressions and make the command exit with status 1. Scenarios use fixed seeds and
+the parameters of the existing scripts so numbers stay comparable between runs.
+"""
+import argparse
+import json
+import os
+import platform
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+SCENARIOS = {}
+
+
+def scenario(unit, higher_is_better=True, needs=None):
+    """Register fn() -> (count, seconds). Reported as count / seconds, or seconds / count when lower is better."""
+    def register(fn):
+        SCENARIOS[fn.__name__] = dict(fn=fn, unit=unit, higher_is_better=higher_is_better, needs=needs)
+        return fn
+    return register
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def _script(*path):
+    # Script modules only define their scenes unless run as __main__.
+    return runpy.run_path(os.path.join(ROOT, *path), run_name='benchmark')
+
+
+# Physics
+
+@scenario('steps/s')
+def two_body_steps():
+    from exosim.physics import OscilatingSystem
+    system = OscilatingSystem(5.972e24, 7.348e23, 384.4e6, [0, 0, 0], [-500, 1022, 0])  # orbit/astrometry.py
+    steps = 20000
+
+    def run():
+        for _ in range(steps):
+            system.update(8000)
+    return steps, _timed(run)
+
+
+def _ensemble_steps(system_class):
+    n = 100_000
+    masses = np.random.default_rng(0).uniform(1e22, 1e24, n)
+    system = system_class(5.972e24, masses, 384.4e6, [0, 0, 0], [-500, 1022, 0])
+    steps = 50
+
+    def run():
+        for _ in range(steps):
+            system.update(8000)
+    return n * steps, _timed(run)
+
+
+@scenario('system-steps/s')
+def ensemble_steps_float64():
+    from exosim.physics import OscilatingSystem
+    return _ensemble_steps(OscilatingSystem)
+
+
+@scenario('system-steps/s')
+def ensemble_steps_float32():
+    from exosim.physics import OscilatingSystem32
+    return _ensemble_steps(OscilatingSystem32)
+
+
+@scenario('bodies/s')
+def encounter_detection():
+    from exosim.encounters import close_pairs
+    positions = np.random.default_rng(0).uniform(0, 1e4, (200_000, 3))
+    return len(positions), _timed(close_pairs, positions, 10.0)
+
+
+# Photometry
+
+def _transit_positions(n):
+    from exosim.photometry import get_orbit_position
+    t = np.random.default_rng(0).uniform(0, 10, n)
+    return get_orbit_position(t, 10, 5 + 2 + 1.25)  # transit/orbiting_static.py
+
+
+@scenario('samples/s')
+def light_intensity_scalar():
+    from exosim.photometry import calculate_light_intensity
+    xs, ys = _transit_positions(20000)
+    return len(xs), _timed(lambda: [calculate_light_intensity(x, y, 2, 1.25) for x, y in zip(xs, ys)])
+
+
+@scenario('samples/s')
+def light_intensity_array():
+    from exosim.photometry import calculate_light_intensity
+    xs, ys = _transit_positions(2_000_000)
+    return len(xs), _timed(calculate_light_intensity, xs, ys, 2, 1.25)
+
+
+@scenario('samples/s')
+def orbit_light_curve_windowed():
+    # A year-long orbit sampled every minute for ten years: transits are ~0.5% of the samples.
+    from exosim.photometry import orbit_light_curve
+    t = np.arange(0, 10 * 365 * 86400, 60.0)
+    return len(t), _timed(orbit_light_curve, t, 365 * 86400, 1.496e11, 6.957e8, 6.9911e7)
+
+
+@scenario('grid points/s')
+def detectability_grid():
+    from exosim.detectability import DetectabilityConfig, detectability_map
+    config = DetectabilityConfig(chunk=1 << 18)
+    return int(np.prod(config.shape)), _timed(detectability_map, config, 1)
+
+
+@scenario('samples/s')
+def flux_engine_two_planets():
+    from exosim.flux import FluxEngine
+    engine = FluxEngine(128, (0.4, 0.26), refine=8)
+    x = np.linspace(-1.5, 1.5, 2000)
+    occulters = np.stack([np.stack([x, np.zeros_like(x), np.full_like(x, 0.1)], -1),
+                          np.stack([-x, np.full_like(x, 0.3), np.full_like(x, 0.05)], -1)], axis=1)
+    return len(x), _timed(engine.flux, occulters)
+
+
+# Fitting
+
+@scenario('stars/s')
+def astrometric_fit():
+    from exosim.astrometric_fit import fit_astrometric_orbits
+    rng = np.random.default_rng(0)
+    t = np.arange(1000) * 86400.0
+    period = rng.uniform(20, 200, (200, 1)) * 86400
+    x = 1e9 * np.cos(2 * np.pi * t / period) + rng.normal(0, 1e7, (200, 1000))
+    y = 5e8 * np.sin(2 * np.pi * t / period)
+    return len(x), _timed(fit_astrometric_orbits, t, x, y, 2e30)
+
+
+# Color mapping
+
+def _wavelengths(n):
+    return np.random.default_rng(0).uniform(350, 780, n)
+
+
+@scenario('conversions/s')
+def wavelength_to_rgb_scalar():
+    from exosim.color import wavelength_to_rgb
+    ws = _wavelengths(50000)
+    return len(ws), _timed(lambda: [wavelength_to_rgb(w) for w in ws])
+
+
+@scenario('conversions/s')
+def wavelength_to_rgb_array():
+    from exosim.color import wavelengths_to_rgb
+    ws = _wavelengths(2_000_000)
+    return len(ws), _timed(wavelengths_to_rgb, ws)
+
+
+# Rendering
+
+def _render(scene, frames, dpi=100):
+    from exosim.export import prepare_canvas
+    fig, update = scene()
+    canvas = prepare_canvas(fig, dpi)
+
+    def run():
+        for frame in range(frames):
+            update(frame)
+            canvas.draw()
+            canvas.buffer_rgba()
+    seconds = _timed(run)
+    import matplotlib.pyplot as plt
+    plt.close(fig)
+    return frames, seconds
+
+
+@scenario('frames/s')
+def doppler_render():
+    return _render(_script('doppler', 'doppler_vid_gen.py')['build_scene'], 10)
+
+
+@scenario('frames/s')
+def neighbors_render():
+    return _render(_script('astrometry', 'neighbor_vid_gen.py')['build_scene'], 60)
+
+
+@scenario('frames/s')
+def neighbors_history_view_render():
+    from exosim.physics import OscilatingSystem2D
+    from exosim.pipeline import HistoryView
+    from exosim.trajectory import Trajectory
+    trajectory = Trajectory.record(OscilatingSystem2D(6.4524e24, 4.348e23, 84.4e7, [0, 0], [0, 700]), 86400, 300)
+    return _render(HistoryView(trajectory), 60)
+
+
+@scenario('s/frame', higher_is_better=False, needs='ffmpeg')
+def video_export():
+    from exosim.export import export_video
+    scene = _script('astrometry', 'neighbor_vid_gen.py')['build_scene']
+    frames = 30
+    tmp = tempfile.mkdtemp()
+    try:
+        return frames, _timed(export_video, scene, frames, os.path.join(tmp, 'bench.mp4'), 30, 180)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_scenarios(names, repeat):
+    results = {}
+    for name in names:
+        spec = SCENARIOS[name]
+        if spec['needs'] and shutil.which(spec['needs']) is None:
+            print(f"{name:32s} skipped ({spec['needs']} not found)")
+            continue
+        # Best of `repeat`: the least disturbed run is the most reproducible figure.
+        count, seconds = min((spec['fn']() for _ in range(repeat)), key=lambda r: r[1] / r[0])
+        value = count / seconds if spec['higher_is_better'] else seconds / count
+        results[name] = dict(value=value, unit=spec['unit'], higher_is_better=spec['higher_is_better'])
+        print(f"{name:32s} {value:14.6g} {spec['unit']}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of scenarios more than `tolerance` (a fraction) worse than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]['value'], result['value']
+        change = (new - old) / old if result['higher_is_better'] else (old - new) / old
+        flag = ''
+        if change < -tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:32s} {change:+8.1%} vs baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='pattern', default='', help="only run scenarios whose name contains this")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=os.path.join(HERE, 'results.json'))
+    parser.add_argument('--baseline', default=os.path.join(HERE, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before flagging, as a fraction")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    names = [name for name in SCENARIOS if args.pattern in name]
+    results = run_scenarios(names, args.repeat)
+    report = dict(
+        machine=dict(platform=platform.platform(), python=platform.python_version(), numpy=np.__version__,
+                     matplotlib=matplotlib.__version__, cpus=os.cpu_count()),
+        time=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        results=results,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
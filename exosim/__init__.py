@@ -0,0 +1,55 @@
+"""Shared simulation and rendering helpers for the exoplanet detection sims.
+
+The scripts under astrometry/, doppler/, orbit/ and transit/ import from this
+package. Install it once in editable mode from the repository root,
+
+    pip install -e .
+
+and the scripts run from anywhere (``python orbit/astrometry.py``), with edits to
+exosim picked up immediately. Without installing, run them with the repository
+root on the path (PyCharm's default "add content roots to PYTHONPATH", or e.g.
+``python -m astrometry.neighbor_comparison``).
+
+Compute modules (physics, photometry, color, astrometric_fit, trajectory, ...)
+never import matplotlib, and the rendering modules only import it once they
+draw, so worker processes and headless jobs start without loading pyplot. The
+names below are resolved lazily for the same reason.
+"""
+import importlib
+
+_exports = {
+    'G': 'physics',
+    'OscilatingSystem': 'physics',
+    'OscilatingSystem2D': 'physics',
+    'OscilatingSystem32': 'physics',
+    'NBodySystem': 'physics',
+    'get_orbit_position': 'photometry',
+    'calculate_light_intensity': 'photometry',
+    'transit_light_curve': 'photometry',
+    'transit_windows': 'photometry',
+    'orbit_light_curve': 'photometry',
+    'FluxEngine': 'flux',
+    'DetectabilityConfig': 'detectability',
+    'detectability_map': 'detectability',
+    'wavelength_to_rgb': 'color',
+    'wavelengths_to_rgb': 'color',
+    'map_range': 'color',
+    'wavelength': 'color',
+    'Trajectory': 'trajectory',
+    'fit_astrometric_orbits': 'astrometric_fit',
+    'AnimatedWindow': 'windows',
+    'AnimatedWindow3D': 'windows',
+    'export_video': 'export',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'{__name__}.{_exports[name]}'), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+from exosim.physics import G
+
+
+@dataclass
+class AstrometricFit:
+    """Per-star results of fit_astrometric_orbits. Every field has shape (n_stars,), SI units."""
+    period: np.ndarray  # s
+    semi_major_axis: np.ndarray  # Of the relative (star-companion) orbit, m
+    mass_ratio: np.ndarray  # companion mass / host mass
+    companion_mass: np.ndarray  # kg
+    star_semi_major_axis: np.ndarray  # Of the host's own wobble around the barycenter, m
+    center: np.ndarray  # (n_stars, 2), position of the barycenter at the mean epoch
+    drift: np.ndarray  # (n_stars, 2), barycenter velocity, m/s
+    rms: np.ndarray  # Residual RMS of the fitted displacements, m
+
+
+def _design(t, freqs, t_mid, span):
+    # Columns: offset, linear drift, cos, sin. freqs broadcast against t along the leading axes.
+    phase = 2 * np.pi * freqs[..., None] * t
+    tau = np.broadcast_to((t - t_mid) / span, phase.shape)
+    return np.stack([np.ones_like(phase), tau, np.cos(phase), np.sin(phase)], axis=-1)
+
+
+def _solve(xtx, xty, yty):
+    # Least squares through the normal equations, batched over every leading axis.
+    coef = np.linalg.solve(xtx, xty[..., None])[..., 0]
+    rss = yty - np.einsum('...k,...k->...', coef, xty)
+    return coef, rss
+
+
+def _grid_rss(t, xy, freqs, t_mid, span, chunk):
+    # Shared time axis: one design matrix per trial frequency serves every star, so X^T Y is a gemm.
+    yty = np.einsum('sn,sn->s', xy, xy)
+    rss = np.empty((len(freqs), len(xy)))
+    for start in range(0, len(freqs), chunk):
+        X = _design(t, freqs[start:start + chunk], t_mid, span)  # (p, n, 4)
+        xtx = np.einsum('pnk,pnj->pkj', X, X)
+        xty = (X.transpose(0, 2, 1).reshape(-1, X.shape[1]) @ xy.T).reshape(len(X), 4, -1)
+        _, r = _solve(xtx[:, None], xty.transpose(0, 2, 1), yty)
+        rss[start:start + chunk] = r
+    return rss
+
+
+def _star_fit(t, x, y, freqs, t_mid, span):
+    # One trial frequency per star: (s,) freqs against (s, n) displacements. X and Y share the design.
+    X = _design(t, freqs, t_mid, span)  # (s, n, 4)
+    Xt = X.transpose(0, 2, 1)
+    xy = np.stack([x, y], axis=-1)  # (s, n, 2)
+    xty = Xt @ xy
+    coef = np.linalg.solve(Xt @ X, xty)
+    rss = np.einsum('snc,snc->s', xy, xy) - np.einsum('skc,skc->s', coef, xty)
+    return coef[..., 0], coef[..., 1], rss
+
+
+def _projected_rss(n, tt, c, s, tc, ts, cc, cs, data):
+    """
+    Residual sum of squares of the offset + drift + cos + sin fit from the sums of its normal
+    equations, with the offset and drift columns eliminated analytically (they are orthogonal, as
+    tau sums to zero) and the remaining 2x2 system inverted in closed form. Elementwise over any
+    shape, so no batched solve is needed. data holds (sum v, sum tau v, sum v^2, sum v cos, sum v sin)
+    per displacement axis.
+    """
+    scc = cc - c * c / n - tc * tc / tt
+    sss = (n - cc) - s * s / n - ts * ts / tt
+    scs = cs - c * s / n - tc * ts / tt
+    det = scc * sss - scs * scs
+    rss = 0
+    for v, tv, vv, vc, vs in data:
+        rc = vc - c * v / n - tc * tv / tt
+        rs = vs - s * v / n - ts * tv / tt
+        rss = rss + vv - v * v / n - tv * tv / tt - (sss * rc * rc - 2 * scs * rc * rs + scc * rs * rs) / det
+    return rss
+
+
+def _prepare(t, x, y, t_mid, span, step):
+    # Everything in the normal equations that doesn't depend on the trial frequency.
+    tau = np.broadcast_to((t - t_mid) / span, x.shape)
+    dot = lambda a, b: np.einsum('sn,sn->s', a, b)
+    start = None if step is None else np.atleast_2d(t)[:, 0]
+    return tau, dot(tau, tau), [(v.sum(axis=-1), dot(v, tau), dot(v, v)) for v in (x, y)], start, step
+
+
+def _phasor_rss(c, s, x, y, prepared):
+    # Residuals from cos and sin of the phases, (s, n) with one trial frequency per star.
+    tau, tt, sums = prepared[:3]
+    dot = lambda a, b: np.einsum('sn,sn->s', a, b)
+    data = [(v_sum, tv, vv, dot(v, c), dot(v, s)) for v, (v_sum, tv, vv) in zip((x, y), sums)]
+    return _projected_rss(c.shape[-1], tt, c.sum(axis=-1), s.sum(axis=-1), dot(c, tau), dot(s, tau),
+                          dot(c, c), dot(c, s), data)
+
+
+def _star_rss(t, x, y, freqs, prepared):
+    # Like _star_fit's rss, but summed without building the (s, n, 4) design matrix.
+    start, step = prepared[3:]
+    if step is None:
+        phase = 2 * np.pi * freqs[:, None] * t
+        return _phasor_rss(np.cos(phase), np.sin(phase), x, y, prepared)
+    # Regular sampling: exp(i omega t_j) is a running product of one rotation per step, far cheaper than trig.
+    z = np.empty(x.shape, dtype=complex)
+    z[:, 0] = np.exp(2j * np.pi * freqs * start)
+    z[:, 1:] = np.exp(2j * np.pi * freqs * step)[:, None]
+    np.cumprod(z, axis=1, out=z)
+    return _phasor_rss(np.ascontiguousarray(z.real), np.ascontiguousarray(z.imag), x, y, prepared)
+
+
+def _uniform_step(t):
+    # The sampling step if every star is sampled at the same regular step (offsets may differ), else None.
+    steps = np.diff(t, axis=-1)
+    step = steps.flat[0] if steps.size else 0
+    return step if step > 0 and np.allclose(steps, step, rtol=1e-9, atol=0) else None
+
+
+def _fft_grid_rss(t, x, y, step, min_period, max_period, oversample):
+    """
+    Trial frequencies k / (L step) for regularly sampled stars and their residuals, (freqs, rss of
+    shape (n_freqs, n_stars)). Every sum in the normal equations is then a DFT value at k (or 2k for
+    cos^2 and cos sin), so one zero-padded FFT of length L >= oversample * n per star replaces
+    building a design matrix per trial frequency: O(n log n) per star instead of O(n^2).
+    """
+    n = t.shape[-1]
+    L = 1 << int(np.ceil(np.log2(oversample * n)))
+    k = np.arange(int(np.ceil(L * step / max_period)), int(L * step / min_period) + 1)
+    freqs = k / (L * step)
+    t0 = np.atleast_2d(t)[:, :1]  # Per-star start; the rest of the phase is the DFT kernel
+    tau = (np.arange(n) - (n - 1) / 2) / (n - 1)  # (t - t_mid) / span, the same for every star
+
+    # sum_j w_j exp(i 2 pi k j / L) for real w is conj(fft(w)[k]); a star starting at t0 adds exp(i omega t0).
+    ones_k = np.conj(np.fft.fft(np.ones(n), L))
+    one_k, two_k, tau_k = ones_k[k], ones_k[(2 * k) % L], np.conj(np.fft.fft(tau, L))[k]
+    tt = (tau * tau).sum()
+    rss = np.empty((len(k), len(x)))
+    rows = max(1, (1 << 20) // len(k))  # Stars per block, bounding the (stars, freqs) temporaries
+    for lo in range(0, len(x), rows):
+        xb, yb = x[lo:lo + rows], y[lo:lo + rows]
+        turn = np.exp(2j * np.pi * freqs * t0[lo:lo + rows] if len(t0) > 1 else 2j * np.pi * freqs * t0)
+        turn = np.broadcast_to(turn, (len(xb), len(k)))
+        e1, e2, et = turn * one_k, turn * turn * two_k, turn * tau_k
+        data = [(v.sum(axis=-1)[:, None], (v @ tau)[:, None], np.einsum('sn,sn->s', v, v)[:, None], e.real, e.imag)
+                for v, e in ((xb, turn * np.conj(np.fft.fft(xb, L, axis=-1))[:, k]),
+                             (yb, turn * np.conj(np.fft.fft(yb, L, axis=-1))[:, k]))]
+        rss[:, lo:lo + rows] = _projected_rss(n, tt, e1.real, e1.imag, et.real, et.imag, (n + e2.real) / 2,
+                                              e2.imag / 2, data).T
+    return freqs, rss
+
+
+def _mass_ratio(star_a, host_mass, period, iterations=100):
+    """
+    Solve a_star = C * q * (1 + q)^(-2/3) for q, with C = (G * M * P^2 / 4pi^2)^(1/3) from Kepler's
+    third law. The right hand side is monotonic in q, so a vectorised bisection always converges.
+    """
+    C = np.cbrt(G * host_mass * period ** 2 / (4 * np.pi ** 2))
+    target = star_a / C
+    lo = np.zeros_like(target)
+    hi = np.maximum(1.0, 4 * target ** 3)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        below = mid * (1 + mid) ** (-2 / 3) < target
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    q = (lo + hi) / 2
+    return q, C * np.cbrt(1 + q)
+
+
+def fit_astrometric_orbits(t, x, y, host_mass, min_period=None, max_period=None, n_periods=None,
+                           oversample=5, refine_iterations=40, chunk=64) -> AstrometricFit:
+    """
+    Recover the companion of one or many stars from the host's X/Y displacement histories, as
+    recorded by the astrometry scripts.
+
+    The model is a circular orbit seen at any orientation (an ellipse on the sky) plus a linear drift
+    of the barycenter. For a fixed period that model is linear in its parameters, so the whole period
+    grid is evaluated for every star at once with batched least squares; the best grid period is then
+    polished with a per-star golden section search between its grid neighbours. Regularly sampled
+    histories (the scripts' fixed dt, start times may differ per star) get the grid's normal
+    equations from zero-padded FFTs, O(n log n) per star rather than O(n^2).
+
+    t: (n,) sample times shared by every star, or (n_stars, n).
+    x, y: (n,) or (n_stars, n) host displacements in meters.
+    host_mass: Mass of the host star(s) in kg, scalar or (n_stars,).
+    n_periods: Size of the trial grid. By default the grid is spaced `oversample` times finer than
+        the 1 / baseline width of a periodogram peak, so no orbit can fall between two trials.
+    """
+    x, y = np.atleast_2d(np.asarray(x, dtype=float)), np.atleast_2d(np.asarray(y, dtype=float))
+    t = np.asarray(t, dtype=float)
+    if x.shape != y.shape or t.shape[-1] != x.shape[-1]:
+        raise ValueError("t, x and y must describe the same samples.")
+    if not (np.isfinite(x).all() and np.isfinite(y).all() and np.isfinite(t).all()):
+        raise ValueError("Displacement histories must not contain NaN or inf.")
+
+    t_mid = t.mean(axis=-1, keepdims=True)
+    span = np.ptp(t, axis=-1, keepdims=True)
+    step = np.median(np.diff(np.sort(t, axis=-1), axis=-1))
+    min_period = 3 * step if min_period is None else min_period
+    max_period = span.min() if max_period is None else max_period
+    regular = _uniform_step(t)
+    prepared = _prepare(t, x, y, t_mid, span, regular)
+
+    # Uniform in frequency, which is how resolution is distributed in a periodogram. Regularly
+    # sampled stars get the FFT grid unless the caller fixed its size.
+    if regular is not None and n_periods is None:
+        freqs, rss = _fft_grid_rss(t, x, y, regular, min_period, max_period, oversample)
+    else:
+        if n_periods is None:
+            n_periods = int(np.ceil(oversample * span.max() * (1 / min_period - 1 / max_period))) + 1
+        freqs = np.linspace(1 / max_period, 1 / min_period, n_periods)
+        if t.ndim == 1:
+            rss = _grid_rss(t, np.vstack([x, y]), freqs, t_mid, span, chunk).reshape(n_periods, 2, -1).sum(axis=1)
+        else:
+            # Step the phasors from one trial frequency to the next with a multiplication instead of trig.
+            spacing = (freqs[-1] - freqs[0]) / max(n_periods - 1, 1)
+            z, turn = np.exp(2j * np.pi * freqs[0] * t), np.exp(2j * np.pi * spacing * t)
+            rss = np.empty((n_periods, len(x)))
+            for i in range(n_periods):
+                rss[i] = _phasor_rss(z.real, z.imag, x, y, prepared)
+                z = z * turn
+    n_periods = len(freqs)
+
+    best = np.argmin(rss, axis=0)
+    lo = freqs[np.maximum(best - 1, 0)]
+    hi = freqs[np.minimum(best + 1, n_periods - 1)]
+
+    # Golden section refinement, every star stepping in lockstep.
+    ratio = (np.sqrt(5) - 1) / 2
+    c, d = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+    rc, rd = _star_rss(t, x, y, c, prepared), _star_rss(t, x, y, d, prepared)
+    for _ in range(refine_iterations):
+        left = rc < rd
+        hi, lo = np.where(left, d, hi), np.where(left, lo, c)
+        c_new, d_new = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        # One of the two probes carries over; only the other needs a fresh evaluation.
+        fresh = np.where(left, c_new, d_new)
+        r_fresh = _star_rss(t, x, y, fresh, prepared)
+        rd, rc = np.where(left, rc, r_fresh), np.where(left, r_fresh, rd)
+        c, d = np.where(left, c_new, d), np.where(left, c, d_new)
+    freq = (lo + hi) / 2
+
+    cx, cy, rss = _star_fit(t, x, y, freq, t_mid, span)
+    # Rows of the sky-projection matrix; its largest singular value is the true orbital radius.
+    projection = np.stack([cx[:, 2:], cy[:, 2:]], axis=1)
+    star_a = np.linalg.svd(projection, compute_uv=False)[:, 0]
+
+    period = 1 / freq
+    host_mass = np.broadcast_to(np.asarray(host_mass, dtype=float), period.shape)
+    q, a = _mass_ratio(star_a, host_mass, period)
+    return AstrometricFit(
+        period=period,
+        semi_major_axis=a,
+        mass_ratio=q,
+        companion_mass=q * host_mass,
+        star_semi_major_axis=star_a,
+        center=np.stack([cx[:, 0], cy[:, 0]], axis=-1),
+        drift=np.stack([cx[:, 1], cy[:, 1]], axis=-1) / span.reshape(-1, 1),
+        rms=np.sqrt(np.maximum(rss, 0) / (2 * x.shape[-1])),
+    )
@@ -0,0 +1,344 @@
+"""
+Run scenario files: JSON definitions of simulations, light curves and videos, expanded over parameter
+grids and executed across a process pool.
+
+    python -m exosim.batch scenarios/*.json              # every job, on every core
+    python -m exosim.batch scenarios/transit.json -n 4   # at most 4 jobs at a time
+    python -m exosim.batch scenarios/*.json --dry-run    # list the jobs and whether they would run
+
+A scenario file holds one scenario object or a list of them:
+
+    {
+      "name": "neighbors_{view}",
+      "kind": "video",
+      "output": "out/neighbors/{view}.mp4",
+      "params": {"ma": 6.4524e24, "mb": 4.348e23, "d": 84.4e7, "dt": 86400, "steps": 300, ...},
+      "grid": {"view": ["system", "x", "y"]}
+    }
+
+Every combination of the `grid` values is merged over `params` to make one job; `name` and `output`
+are format strings over the job's parameters. Paths are relative to the working directory, so run
+from the repository root like the scripts. Jobs whose output already exists are skipped unless
+--force is given, and each job writes its own log to <log-dir>/<name>.log.
+
+Trajectory and light curve outputs ending in .npz are single numpy archives; any other name is
+written as a chunked store (see exosim.store). Surveys are always stores, detectability maps .npz.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+KINDS: Dict[str, Callable] = {}
+
+
+def kind(name):
+    """
+    Register fn(params, output) as the runner for jobs of the given kind. It may return a list of
+    notes for the job's log; warnings it raises are logged too.
+    """
+    def register(fn):
+        KINDS[name] = fn
+        return fn
+    return register
+
+
+@dataclass
+class Job:
+    name: str
+    kind: str
+    output: str
+    params: Dict = field(default_factory=dict)
+
+    @property
+    def done(self):
+        return os.path.exists(self.output)
+
+
+def expand(scenario: Dict) -> List[Job]:
+    """Jobs for every combination of a scenario's grid values."""
+    for key in ('name', 'kind', 'output'):
+        if key not in scenario:
+            raise ValueError(f"Scenario is missing '{key}'.")
+    if scenario['kind'] not in KINDS:
+        raise ValueError(f"Unknown scenario kind '{scenario['kind']}'. Known kinds: {', '.join(sorted(KINDS))}.")
+
+    grid = scenario.get('grid', {})
+    jobs = []
+    for values in itertools.product(*grid.values()):
+        params = dict(scenario.get('params', {}), **dict(zip(grid, values)))
+        name = scenario['name'].format(**params)
+        output = scenario['output'].format(name=name, **params)
+        jobs.append(Job(name, scenario['kind'], output, params))
+    return jobs
+
+
+def load_scenarios(path: str) -> List[Job]:
+    with open(path) as f:
+        scenarios = json.load(f)
+    if isinstance(scenarios, dict):
+        scenarios = [scenarios]
+    jobs = []
+    for scenario in scenarios:
+        jobs += expand(scenario)
+    return jobs
+
+
+def _partial(output):
+    # Outputs are written under a temporary name and renamed when complete, so an interrupted job
+    # never leaves behind a file that would make the next run skip it. The extension is kept since
+    # ffmpeg and np.savez pick the format from it.
+    root, ext = os.path.splitext(output)
+    return root + '.partial' + ext
+
+
+def _remove(path):
+    # Outputs are files (videos, .npz) or directories (ColumnStores).
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def run_job(job: Job, log_dir: str) -> Dict:
+    """Run one job, logging to <log_dir>/<name>.log. Failures are logged and returned, not raised."""
+    os.makedirs(log_dir, exist_ok=True)
+    logger = logging.getLogger('exosim.batch.' + job.name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(os.path.join(log_dir, job.name + '.log'), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+
+    start = time.perf_counter()
+    result = dict(name=job.name, output=job.output, status='done', error=None)
+    try:
+        logger.info("%s job, writing %s", job.kind, job.output)
+        logger.info("params: %s", json.dumps(job.params, sort_keys=True))
+        os.makedirs(os.path.dirname(os.path.abspath(job.output)), exist_ok=True)
+        partial = _partial(job.output)
+        _remove(partial)  # Left by a run that was killed before it could clean up
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            notes = KINDS[job.kind](job.params, partial)
+        for note in notes or ():
+            logger.info("%s", note)
+        for warning in caught:
+            logger.warning("%s: %s", warning.category.__name__, warning.message)
+        if os.path.isdir(job.output):
+            shutil.rmtree(job.output)  # A store being redone with --force
+        os.replace(partial, job.output)
+    except Exception as e:
+        logger.error("failed:\n%s", traceback.format_exc())
+        result.update(status='failed', error=f"{type(e).__name__}: {e}")
+        _remove(_partial(job.output))
+    finally:
+        result['seconds'] = time.perf_counter() - start
+        logger.info("%s in %.2f s", result['status'], result['seconds'])
+        logger.removeHandler(handler)
+        handler.close()
+    return result
+
+
+def run_batch(jobs: Iterable[Job], workers: int | None = None, log_dir: str = 'logs', force: bool = False,
+              echo: Callable[[str], object] = print) -> List[Dict]:
+    """
+    Run `jobs` over a process pool (in-process with one worker), skipping those whose output exists
+    unless `force`. Returns one result dict per job, in the order given.
+    """
+    jobs = list(jobs)
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Job names must be unique, since each job logs to <name>.log.")
+
+    results = {}
+    todo = []
+    for job in jobs:
+        if job.done and not force:
+            results[job.name] = dict(name=job.name, output=job.output, status='skipped', error=None, seconds=0.0)
+            echo(f"skipped  {job.name} ({job.output} exists)")
+        else:
+            todo.append(job)
+
+    def report(result):
+        results[result['name']] = result
+        line = f"{result['status']:<8} {result['name']} ({result['seconds']:.1f} s)"
+        echo(line if result['error'] is None else line + " " + result['error'])
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(todo) <= 1:
+        for job in todo:
+            report(run_job(job, log_dir))
+    else:
+        with ProcessPoolExecutor(min(workers, len(todo))) as pool:
+            for future in as_completed([pool.submit(run_job, job, log_dir) for job in todo]):
+                report(future.result())
+    return [results[name] for name in names]
+
+
+# Job kinds. Parameter names follow the scripts the scenarios were taken from.
+
+def _save(output, **columns):
+    # .npz for small results; any other output is written as a chunked ColumnStore directory.
+    if output.endswith('.npz'):
+        np.savez(output, **columns)
+    else:
+        from exosim.store import ColumnStore
+        ColumnStore.write(output, columns, 't')
+
+
+def simulate_trajectory(params):
+    """Trajectory of the two-body system in params; precision 'float32' records float32 states after a check."""
+    from exosim.physics import OscilatingSystem, OscilatingSystem32
+    from exosim.trajectory import Trajectory
+    system_class = {'float64': OscilatingSystem, 'float32': OscilatingSystem32}[params.get('precision', 'float64')]
+    system = system_class(params['ma'], params['mb'], params['d'],
+                          params.get('a_init_v', (0, 0, 15)), params.get('b_init_v', (0, 1022, 0)))
+    return Trajectory.record(system, params['dt'], params['steps'])
+
+
+def _notes(*reports):
+    return [str(report) for report in reports if report is not None]
+
+
+@kind('trajectory')
+def trajectory_job(params, output):
+    """Two-body integration saved as t, positions and velocities."""
+    trajectory = simulate_trajectory(params)
+    _save(output, t=trajectory.t, positions=trajectory.positions, velocities=trajectory.velocities)
+    return _notes(trajectory.precision)
+
+
+def circular_light_curve(params):
+    """
+    Times and flux of a transit on a circular orbit (transit/orbiting_static.py), and the float32
+    check's report when params ask for precision 'float32' (None otherwise).
+    """
+    from exosim.photometry import get_orbit_position, orbit_light_curve
+    t = np.linspace(0, params['orbit_time'] * params.get('orbit_count', 1), params['samples'])
+    dtype = np.dtype(params.get('precision', 'float64'))
+    flux = orbit_light_curve(t, params['orbit_time'], params['distance'], params['sun_radius'],
+                             params['exp_radius'], dtype.type)
+    report = None
+    if dtype == np.float32:
+        from exosim.precision import check_light_curve
+        x, y = get_orbit_position(t, params['orbit_time'], params['distance'])
+        report = check_light_curve(x, y, params['sun_radius'], params['exp_radius'])
+    return t, flux, report
+
+
+@kind('light_curve')
+def light_curve_job(params, output):
+    """Transit light curve of a circular orbit, saved as t and flux."""
+    t, flux, report = circular_light_curve(params)
+    _save(output, t=t, flux=flux)
+    return _notes(report)
+
+
+@kind('survey')
+def survey_job(params, output):
+    """
+    Synthetic survey (see exosim.survey) written as a chunked store. Every param other than `workers`
+    (processes for this job's chunks, default 1 since the batch already uses the cores) is a
+    SurveyConfig field.
+    """
+    from exosim.survey import SurveyConfig, generate_survey
+    params = dict(params)
+    workers = params.pop('workers', 1)
+    store = generate_survey(output, SurveyConfig(**params), workers)
+    return ["%d systems x %d observations" % (len(store), len(store.attrs['times']))]
+
+
+@kind('detectability')
+def detectability_job(params, output):
+    """
+    Detectability maps (see exosim.detectability) saved as .npz, each at the shape of the axes it
+    depends on. Axes may be given as lists or as ['geomspace', lo, hi, n]; every other param except
+    `workers` (default 1) is a DetectabilityConfig field.
+    """
+    from exosim.detectability import METHODS, DetectabilityConfig, detectability_map
+    params = dict(params)
+    workers = params.pop('workers', 1)
+    for name in ('planet_mass', 'planet_radius', 'semi_major_axis'):
+        if isinstance(params.get(name), list) and params[name][:1] == ['geomspace']:
+            params[name] = np.geomspace(*params[name][1:3], int(params[name][3]))
+    result = detectability_map(DetectabilityConfig(**params), workers)
+    result.save(output)
+    return ["%s detects %.1f%% of the grid" % (method, 100 * result.fraction(method)) for method in METHODS]
+
+
+@kind('video')
+def video_job(params, output):
+    """
+    Two-body integration rendered as one view: 'system' (top-down, with lines to `references`) or
+    'x'/'y'/'z' (displacement of body A over time). With `frame_dt`, frames are interpolated at that
+    simulated-time spacing instead of one per integration step. Frames render in this process, since the batch
+    already spreads jobs over the cores.
+    """
+    from exosim.export import H264, PNG_RGBA, render_frames
+    from exosim.frame_cache import FrameCache
+    from exosim.pipeline import HistoryView, SystemView
+    import matplotlib
+    matplotlib.use('Agg')
+
+    trajectory = simulate_trajectory(params)
+    if params.get('frame_dt'):
+        # One frame per frame_dt seconds of simulated time, whatever the integration step. Like the
+        # per-step frames, the first is frame_dt after the initial state.
+        t0, frame_dt = trajectory.t[0], params['frame_dt']
+        frames = int(np.floor((trajectory.t[-1] - t0) / frame_dt + 1e-9))
+        trajectory = trajectory.resample(t0 + frame_dt * np.arange(1, frames + 1))
+    else:
+        # One frame per step, showing the state after it like the scripts: `steps` frames.
+        trajectory = trajectory[1:]
+    view = params.get('view', 'system')
+    if view == 'system':
+        scene = SystemView(trajectory, [tuple(r) for r in params.get('references', ())], params.get('lim', 8e9))
+    elif view in ('x', 'y', 'z'):
+        scene = HistoryView(trajectory, body=0, axis='xyz'.index(view))
+    else:
+        raise ValueError(f"Unknown view '{view}'.")
+    output_args = {'h264': H264, 'png_rgba': PNG_RGBA}[params.get('codec', 'h264')]
+    cache = FrameCache(params['cache']) if params.get('cache') else None
+    render_frames(scene, 0, len(trajectory), output, params.get('fps', 30), params.get('dpi', 180), output_args,
+                  replay=False, cache=cache, cache_key=scene.cache_key)
+    return _notes(trajectory.precision)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run scenario files over a process pool.")
+    parser.add_argument('files', nargs='+', help="scenario JSON files")
+    parser.add_argument('-n', '--workers', type=int, default=None, help="parallel jobs (default: every core)")
+    parser.add_argument('--log-dir', default='logs', help="directory for the per-job logs")
+    parser.add_argument('-f', '--force', action='store_true', help="rerun jobs whose output already exists")
+    parser.add_argument('-k', default=None, help="only jobs whose name contains this string")
+    parser.add_argument('--dry-run', action='store_true', help="list the jobs without running them")
+    args = parser.parse_args(argv)
+
+    jobs = [job for path in args.files for job in load_scenarios(path) if args.k is None or args.k in job.name]
+    if args.dry_run:
+        for job in jobs:
+            state = 'run' if args.force or not job.done else 'skip'
+            print(f"{state:<5} {job.kind:<12} {job.name} -> {job.output}")
+        return 0
+
+    results = run_batch(jobs, args.workers, args.log_dir, args.force)
+    failed = [r for r in results if r['status'] == 'failed']
+    print(f"{len(results)} jobs: {len(results) - len(failed)} ok, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+def wavelength_to_rgb(wavelength, gamma=0.8):
+
+    '''This converts a given wavelength of light to an
+    approximate RGB color value. The wavelength must be given
+    in nanometers in the range from 380 nm through 750 nm
+    (789 THz through 400 THz).
+    Based on code by Dan Bruton
+    http://www.physics.sfasu.edu/astro/color/spectra.html
+    '''
+
+    wavelength = float(wavelength)
+    if wavelength >= 380 and wavelength <= 440:
+        attenuation = 0.3 + 0.7 * (wavelength - 380) / (440 - 380)
+        R = ((-(wavelength - 440) / (440 - 380)) * attenuation) ** gamma
+        G = 0.0
+        B = (1.0 * attenuation) ** gamma
+    elif wavelength >= 440 and wavelength <= 490:
+        R = 0.0
+        G = ((wavelength - 440) / (490 - 440)) ** gamma
+        B = 1.0
+    elif wavelength >= 490 and wavelength <= 510:
+        R = 0.0
+        G = 1.0
+        B = (-(wavelength - 510) / (510 - 490)) ** gamma
+    elif wavelength >= 510 and wavelength <= 580:
+        R = ((wavelength - 510) / (580 - 510)) ** gamma
+        G = 1.0
+        B = 0.0
+    elif wavelength >= 580 and wavelength <= 645:
+        R = 1.0
+        G = (-(wavelength - 645) / (645 - 580)) ** gamma
+        B = 0.0
+    elif wavelength >= 645 and wavelength <= 750:
+        attenuation = 0.3 + 0.7 * (750 - wavelength) / (750 - 645)
+        R = (1.0 * attenuation) ** gamma
+        G = 0.0
+        B = 0.0
+    else:
+        R = 0.0
+        G = 0.0
+        B = 0.0
+    return R, G, B, 1
+
+
+def wavelengths_to_rgb(wavelengths, gamma=0.8):
+    """wavelength_to_rgb for a whole array at once. Returns an (n, 4) RGBA array."""
+    w = np.asarray(wavelengths, dtype=float).ravel()
+    # Same bands as wavelength_to_rgb; np.select takes the first match like its if/elif chain.
+    bands = [(w >= lo) & (w <= hi) for lo, hi in [(380, 440), (440, 490), (490, 510), (510, 580), (580, 645), (645, 750)]]
+    with np.errstate(invalid='ignore'):  # Out-of-band branches may take fractional powers of negatives
+        violet = 0.3 + 0.7 * (w - 380) / (440 - 380)
+        red = 0.3 + 0.7 * (750 - w) / (750 - 645)
+        R = np.select(bands, [((-(w - 440) / (440 - 380)) * violet) ** gamma, 0.0, 0.0,
+                              ((w - 510) / (580 - 510)) ** gamma, 1.0, red ** gamma], 0.0)
+        G = np.select(bands, [0.0, ((w - 440) / (490 - 440)) ** gamma, 1.0, 1.0,
+                              (-(w - 645) / (645 - 580)) ** gamma, 0.0], 0.0)
+        B = np.select(bands, [violet ** gamma, 1.0, (-(w - 510) / (510 - 490)) ** gamma, 0.0, 0.0, 0.0], 0.0)
+    return np.stack([R, G, B, np.ones_like(w)], axis=-1)
+
+
+def map_range(x, in_min, in_max, out_min, out_max):
+  return (x - in_min) * (out_max - out_min) // (in_max - in_min) + out_min
+
+
+def wavelength(x):
+    return 404*np.cos(x) + 808
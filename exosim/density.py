@@ -0,0 +1,86 @@
+from __future__ import annotations
+from typing import Iterable, Sequence, Tuple
+import numpy as np
+
+# Axis pairs for the named projections of 3D points onto the image plane.
+PROJECTIONS = {'xy': (0, 1), 'xz': (0, 2), 'yz': (1, 2)}
+
+
+class DensityImage:
+    """
+    Rasterises trajectory points into a 2D histogram shown as a single image artist, instead of one
+    marker per point. Points can be accumulated chunk by chunk, so 10^8 samples cost one binning pass
+    and never need to be in memory at once.
+
+    extent: (xmin, xmax, ymin, ymax) of the image, in projected coordinates.
+    projection: 'xy', 'xz', 'yz', or a (2, 3) matrix applied to 3D points. 2D points are used as is.
+    norm: 'log' (default, so sparse parts of an orbit stay visible) or 'linear' shading.
+    """
+
+    def __init__(self, extent: Sequence[float], bins: int | Tuple[int, int] = 512, projection='xy',
+                 norm: str = 'log', cmap: str = 'inferno'):
+        if norm not in ('log', 'linear'):
+            raise ValueError("norm must be 'log' or 'linear'.")
+        self.nx, self.ny = (bins, bins) if np.isscalar(bins) else bins
+        self.extent = tuple(float(e) for e in extent)
+        self.projection = projection
+        self.norm = norm
+        self.cmap = cmap
+        self.counts = np.zeros(self.nx * self.ny, dtype=np.int64)
+        self.artist = None
+
+    @classmethod
+    def fit(cls, points, projection='xy', margin: float = 0.05, **kwargs) -> DensityImage:
+        """Size the image to the projected bounds of `points` (e.g. a first chunk or a coarse subsample)."""
+        img = cls((0, 1, 0, 1), projection=projection, **kwargs)
+        xy = img.project(points)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        pad = (hi - lo) * margin + (hi == lo)
+        img.extent = (lo[0] - pad[0], hi[0] + pad[0], lo[1] - pad[1], hi[1] + pad[1])
+        return img
+
+    def project(self, points) -> np.ndarray:
+        points = np.asarray(points, dtype=float)
+        if points.shape[-1] == 2:
+            return points.reshape(-1, 2)
+        points = points.reshape(-1, points.shape[-1])
+        if isinstance(self.projection, str):
+            return points[:, PROJECTIONS[self.projection]]
+        return points @ np.asarray(self.projection, dtype=float).T
+
+    def accumulate(self, points):
+        """Add a chunk of (n, 2) or (n, 3) points. Points outside the extent are dropped."""
+        xy = self.project(points)
+        x0, x1, y0, y1 = self.extent
+        ix = np.floor((xy[:, 0] - x0) * (self.nx / (x1 - x0))).astype(np.int64)
+        iy = np.floor((xy[:, 1] - y0) * (self.ny / (y1 - y0))).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        # bincount over flat indices is considerably cheaper than histogram2d's general binning.
+        self.counts += np.bincount(iy[inside] * self.nx + ix[inside], minlength=self.counts.size)
+        return self
+
+    def accumulate_chunks(self, chunks: Iterable):
+        for chunk in chunks:
+            self.accumulate(chunk)
+        return self
+
+    def clear(self):
+        self.counts[:] = 0
+
+    def image(self) -> np.ndarray:
+        counts = self.counts.reshape(self.ny, self.nx)
+        peak = counts.max()
+        if peak == 0:
+            return np.zeros(counts.shape)
+        if self.norm == 'log':
+            return np.log1p(counts) / np.log1p(peak)
+        return counts / peak
+
+    def show(self, ax, **kwargs):
+        """Draw (or refresh) the image on `ax`. Returns the AxesImage."""
+        if self.artist is None:
+            self.artist = ax.imshow(self.image(), origin='lower', extent=self.extent, cmap=self.cmap,
+                                    vmin=0, vmax=1, aspect='auto', interpolation='nearest', **kwargs)
+        else:
+            self.artist.set_data(self.image())
+        return self.artist
@@ -0,0 +1,180 @@
+"""
+Which planets could transit photometry, radial velocities (doppler/) and astrometry (astrometry/)
+detect? Signal amplitudes and SNRs of the three methods over a (planet mass, planet radius,
+orbital distance) grid, for circular orbits around one star at a given distance:
+
+    from exosim.detectability import DetectabilityConfig, detectability_map
+    result = detectability_map(DetectabilityConfig(noise={'rv': 0.3}))
+    result.maps['rv_detectable']        # bool, (mass, radius, distance)
+    result.maps['rv_snr']               # (mass, 1, distance): RV doesn't depend on the radius
+
+Each map is kept at the shape of the axes it depends on, so the grid costs memory only for the
+detectability masks. Those are evaluated in blocks of mass rows holding at most `chunk` grid points
+each, on worker processes. Amplitudes follow the survey's
+geometry and units (exosim.survey): transit depth as a fraction of the flux, RV semi-amplitude
+in m/s, astrometric semi-major axis in milliarcseconds. SNRs are those of a matched fit over all
+measurements, assuming white noise:
+
+    transit     depth / sigma_flux * sqrt(transits * duration / cadence)  (see DetectabilityMap.snr)
+    rv          K / sigma_rv * sqrt(epochs / 2)
+    astrometry  alpha / sigma_astrometry * sqrt(epochs * (1 + cos^2 i) / 2)
+
+A method detects a planet when its SNR reaches `threshold`; transits also need min_transits
+expected transits within the baseline, and RV and astrometry min_orbits orbits. Transits are
+assumed to happen (edge-on for the SNR); the transit_probability map gives their geometric
+probability for a random orientation.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from exosim.physics import G
+from exosim.profiling import stage
+from exosim.survey import AU, DAY, M_EARTH, M_JUP, M_SUN, MAS, PC, R_EARTH, R_JUP, R_SUN
+
+METHODS = ('transit', 'rv', 'astrometry')
+# Sigma per measurement: relative flux per photometric sample, m/s per RV epoch, mas per astrometric epoch.
+DEFAULT_NOISE = {'flux': 1e-4, 'rv': 1.0, 'astrometry': 0.01}
+
+
+@dataclass
+class DetectabilityConfig:
+    planet_mass: Sequence[float] = field(default_factory=lambda: np.geomspace(0.1 * M_EARTH, 13 * M_JUP, 200))
+    planet_radius: Sequence[float] = field(default_factory=lambda: np.geomspace(0.5 * R_EARTH, 2 * R_JUP, 100))
+    semi_major_axis: Sequence[float] = field(default_factory=lambda: np.geomspace(0.01 * AU, 30 * AU, 200))
+    star_mass: float = M_SUN
+    star_radius: float = R_SUN
+    distance: float = 10 * PC
+    inclination: float = np.pi / 2  # For RV and astrometry; 90 degrees is edge-on
+    noise: Dict[str, float] = field(default_factory=dict)  # Overrides of DEFAULT_NOISE
+    baseline: float = 4 * 365 * DAY  # Length of the campaign (s), shared by the methods
+    cadence: float = 1800.0  # Photometric sampling interval (s)
+    rv_epochs: int = 100
+    astrometry_epochs: int = 100
+    threshold: float = 7.1
+    min_transits: float = 3
+    min_orbits: float = 1
+    chunk: int = 1 << 20  # Grid points per block
+
+    def __post_init__(self):
+        for name in ('planet_mass', 'planet_radius', 'semi_major_axis'):
+            axis = np.atleast_1d(np.asarray(getattr(self, name), dtype=float))
+            if axis.ndim != 1 or not len(axis) or np.any(axis <= 0):
+                raise ValueError(f"{name} must be a non-empty 1-D sequence of positive values.")
+            setattr(self, name, axis)
+        unknown = set(self.noise) - set(DEFAULT_NOISE)
+        if unknown:
+            raise ValueError(f"Unknown noise terms: {', '.join(sorted(unknown))}.")
+        self.noise = dict(DEFAULT_NOISE, **self.noise)
+        if min(self.noise.values()) <= 0:
+            raise ValueError("Noise levels must be positive.")
+
+    @property
+    def shape(self):
+        return len(self.planet_mass), len(self.planet_radius), len(self.semi_major_axis)
+
+    @property
+    def rows(self) -> int:
+        # Mass rows per block, so a block holds at most `chunk` grid points (and at least one row).
+        return max(1, self.chunk // (self.shape[1] * self.shape[2]))
+
+
+@dataclass
+class DetectabilityMap:
+    config: DetectabilityConfig
+    # Each map keeps the axes it depends on, broadcasting against (mass, radius, distance): e.g. period
+    # is (mass, 1, distance) and transit_depth (1, radius, 1). Only the *_detectable masks are full grids.
+    maps: Dict[str, np.ndarray]
+
+    def full(self, name: str) -> np.ndarray:
+        """A map broadcast (as a read-only view) to the full grid."""
+        return np.broadcast_to(self.maps[name], self.config.shape)
+
+    def snr(self, method: str) -> np.ndarray:
+        """The method's SNR over the full grid. The transit SNR is depth times a (mass, distance) factor."""
+        if method == 'transit':
+            return self.maps['transit_depth'] * self.maps['transit_snr_per_depth']
+        return self.full(method + '_snr')
+
+    def fraction(self, method: str) -> float:
+        """Fraction of the grid the method detects."""
+        return float(self.maps[method + '_detectable'].mean())
+
+    def save(self, path: str):
+        """Axes and maps, at the shapes held in `maps`, as an .npz archive."""
+        np.savez(path, planet_mass=self.config.planet_mass, planet_radius=self.config.planet_radius,
+                 semi_major_axis=self.config.semi_major_axis, **self.maps)
+
+
+def signal_maps(config: DetectabilityConfig, rows: slice = slice(None)) -> Dict[str, np.ndarray]:
+    """Amplitudes, SNRs and the quantities behind them for mass rows `rows`, each at its natural shape."""
+    mp = config.planet_mass[rows, None, None]
+    rp = config.planet_radius[None, :, None]
+    a = config.semi_major_axis[None, None, :]
+    ms, rs = config.star_mass, config.star_radius
+    noise = config.noise
+
+    total = ms + mp
+    period = 2 * np.pi * np.sqrt(a ** 3 / (G * total))
+    orbits = config.baseline / period
+
+    depth = np.minimum((rp / rs) ** 2, 1.0)
+    duration = period / np.pi * np.arcsin(np.minimum(rs / a, 1.0))  # Edge-on, mid-ingress to mid-egress
+
+    sin_i, cos_i = np.sin(config.inclination), np.cos(config.inclination)
+    reflex = mp / total  # The star's orbit over the relative orbit
+    rv_amplitude = reflex * np.sqrt(G * total / a) * sin_i
+    astrometric_amplitude = reflex * a / config.distance * MAS
+
+    return dict(
+        period=period, transit_probability=np.minimum((rs + rp) / a, 1.0),
+        transit_depth=depth, transit_duration=duration, transit_count=orbits,
+        transit_snr_per_depth=np.sqrt(orbits * duration / config.cadence) / noise['flux'],
+        rv_amplitude=rv_amplitude, rv_snr=rv_amplitude / noise['rv'] * np.sqrt(config.rv_epochs / 2),
+        astrometric_amplitude=astrometric_amplitude,
+        astrometry_snr=astrometric_amplitude / noise['astrometry'] * np.sqrt(config.astrometry_epochs * (1 + cos_i ** 2) / 2),
+    )
+
+
+def compute_block(config: DetectabilityConfig, lo: int) -> Dict[str, np.ndarray]:
+    """The *_detectable masks for mass rows [lo, lo + config.rows), with shape (rows, radius, distance)."""
+    with stage('detectability.block'):
+        maps = signal_maps(config, slice(lo, lo + config.rows))
+        orbits = maps['transit_count']
+        shape = orbits.shape[:1] + config.shape[1:]
+        masks = dict(
+            transit_detectable=(maps['transit_depth'] * maps['transit_snr_per_depth'] >= config.threshold) & (orbits >= config.min_transits),
+            rv_detectable=(maps['rv_snr'] >= config.threshold) & (orbits >= config.min_orbits),
+            astrometry_detectable=(maps['astrometry_snr'] >= config.threshold) & (orbits >= config.min_orbits),
+        )
+    return {name: np.broadcast_to(mask, shape) for name, mask in masks.items()}
+
+
+def detectability_map(config: DetectabilityConfig, workers: Optional[int] = None) -> DetectabilityMap:
+    """
+    Evaluate every map over the config's grid. The masks are evaluated in blocks on `workers`
+    processes (None for every core, 1 for in-process) and copied into the full grids as they arrive.
+    """
+    starts = range(0, config.shape[0], config.rows)
+    workers = os.cpu_count() if workers is None else workers
+    maps = signal_maps(config)
+    for method in METHODS:
+        maps[method + '_detectable'] = np.empty(config.shape, dtype=bool)
+
+    def collect(lo, block):
+        for name, value in block.items():
+            maps[name][lo:lo + len(value)] = value
+
+    if workers <= 1 or len(starts) == 1:
+        for lo in starts:
+            collect(lo, compute_block(config, lo))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for lo, block in zip(starts, pool.map(partial(compute_block, config), starts)):
+                collect(lo, block)
+    return DetectabilityMap(config, maps)
@@ -0,0 +1,93 @@
+"""
+Close-encounter and collision detection for many bodies with a uniform spatial hash, so finding
+every pair closer than some distance costs O(N) per step instead of checking all O(N^2) pairs.
+"""
+from __future__ import annotations
+import itertools
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass
+class Encounter:
+    time: float
+    a: int  # Body ids (NBodySystem.ids), a < b
+    b: int
+    distance: float
+    kind: str  # 'close' or 'collision'
+    merged: bool = False
+
+
+class SpatialHash:
+    """
+    Points bucketed into cubic cells of side cell_size, rebuilt from scratch by build(). Cells are
+    keyed by packing their integer coordinates into one int64 and found by sorting, so occupied
+    cells cost memory and empty space doesn't.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive.")
+        self.cell_size = cell_size
+
+    def build(self, positions):
+        positions = np.asarray(positions, dtype=float)
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        # Shift so every cell and its neighbours have non-negative coordinates, then pack.
+        cells -= cells.min(axis=0) - 1
+        extent = cells.max(axis=0) + 2
+        if np.prod(extent.astype(float)) >= 2 ** 62:
+            raise ValueError("Bodies are spread over too many cells; use a larger cell_size.")
+        self.strides = np.concatenate([[1], np.cumprod(extent[:-1])]).astype(np.int64)
+        self.keys = cells @ self.strides
+        self.order = np.argsort(self.keys, kind='stable')
+        self.cell_keys, self.starts, self.counts = np.unique(self.keys[self.order], return_index=True,
+                                                             return_counts=True)
+        return self
+
+    def candidate_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every pair (i, j), i != j, of points in the same or adjacent cells, each pair once."""
+        dim = len(self.strides)
+        # The zero offset plus half of the neighbours: the other half would find the same pairs reversed.
+        offsets = [o for o in itertools.product((-1, 0, 1), repeat=dim) if o > (0,) * dim]
+        firsts, seconds = [], []
+        for offset in [(0,) * dim] + offsets:
+            target = self.keys + np.dot(offset, self.strides)
+            slot = np.minimum(np.searchsorted(self.cell_keys, target), len(self.cell_keys) - 1)
+            source = np.flatnonzero(self.cell_keys[slot] == target)
+            counts = self.counts[slot[source]]
+            total = counts.sum()
+            if not total:
+                continue
+            # Expand each source point against every member of its neighbouring cell.
+            within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            i = np.repeat(source, counts)
+            j = self.order[np.repeat(self.starts[slot[source]], counts) + within]
+            if not any(offset):
+                keep = i < j
+                i, j = i[keep], j[keep]
+            firsts.append(i)
+            seconds.append(j)
+        if not firsts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        i, j = np.concatenate(firsts), np.concatenate(seconds)
+        return np.minimum(i, j), np.maximum(i, j)
+
+
+def close_pairs(positions, distance, radii=None):
+    """
+    Pairs of bodies closer than `distance`, or touching when radii are given (centres closer than
+    r_i + r_j), via a spatial hash. Returns (i, j, separation) arrays with i < j.
+    """
+    positions = np.asarray(positions, dtype=float)
+    reach = distance if radii is None else max(distance, 2 * float(np.max(radii, initial=0)))
+    if len(positions) < 2 or reach <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    i, j = SpatialHash(reach).build(positions).candidate_pairs()
+    separation = np.linalg.norm(positions[i] - positions[j], axis=-1)
+    limit = distance if radii is None else np.maximum(distance, radii[i] + radii[j])
+    keep = separation < limit
+    return i[keep], j[keep], separation[keep]
@@ -0,0 +1,221 @@
+from __future__ import annotations
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+
+from exosim.frame_cache import FrameCache
+from exosim.profiling import count, stage
+
+# matplotlib is imported where frames are actually drawn, so worker processes and compute-only
+# imports of this module don't pay for it.
+
+# Same output settings the scripts used to hand to FuncAnimation.save.
+H264 = ['-vcodec', 'libx264', '-level', '3.0', '-pix_fmt', 'yuv420p']  # For MP4, white background.
+PNG_RGBA = ['-vcodec', 'png', '-pix_fmt', 'rgba']  # For MOV with transparency.
+
+# A scene is a picklable zero-argument callable (e.g. a module level function) building a fresh
+# figure and the update(frame) function that animates it.
+Scene = Callable[[], Tuple[object, Callable[[int], object]]]
+
+
+class FramePipe:
+    """An ffmpeg process reading raw RGBA frames from its stdin."""
+
+    def __init__(self, filename: str, size: Tuple[int, int], fps: float, output_args: Sequence[str]):
+        import matplotlib
+        cmd = [matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', '%dx%d' % size, '-framerate', str(fps),
+               '-i', 'pipe:0', *output_args, filename]
+        self.filename = filename
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, buffer):
+        self.proc.stdin.write(buffer)
+
+    def close(self):
+        if self.proc.stdin.closed:
+            return
+        self.proc.stdin.close()
+        err = self.proc.stderr.read()
+        if self.proc.wait():
+            raise RuntimeError(f"ffmpeg failed writing {self.filename}:\n{err.decode(errors='replace')}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.proc.kill()
+            self.proc.wait()
+
+
+def prepare_canvas(fig, dpi: float):
+    """Attach an offscreen Agg canvas to `fig`, sized to even pixel dimensions for yuv420p."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig.set_dpi(dpi)
+    w, h = fig.get_size_inches()
+    fig.set_size_inches((int(w * dpi) // 2 * 2 + 0.5) / dpi, (int(h * dpi) // 2 * 2 + 0.5) / dpi)
+    return FigureCanvasAgg(fig)
+
+
+def _clear_background(fig):
+    # What savefig(transparent=True) does. Repeated per frame since ax.cla() brings the patch back.
+    fig.patch.set_alpha(0)
+    for ax in fig.axes:
+        ax.patch.set_alpha(0)
+
+
+def render_frames(scene: Scene, start: int, stop: int, filename: str, fps: float = 30, dpi: float = 180,
+                  output_args: Sequence[str] = H264, transparent: bool = False, replay: bool = True,
+                  cache: FrameCache | None = None, cache_key: str | None = None, period: int | None = None):
+    """
+    Render frames [start, stop) of `scene` into `filename`.
+
+    With `replay`, update() is still called for the frames before `start`, without drawing, so scenes that
+    advance a simulation one step per frame arrive at the right state. Stepping is cheap; drawing is not.
+    Scenes whose update(frame) only depends on `frame` should pass replay=False.
+
+    With a `cache` and `cache_key` (see frame_cache.scene_key), frames rendered by an earlier export of the
+    same scene are reused instead of drawn. If the animation repeats every `period` frames, frame i is
+    looked up as frame i % period, falling back to an in-memory cache when no cache is given. That only
+    saves drawing within one export when it spans more than one period.
+    """
+    cache_key = cache_key or getattr(scene, 'cache_key', None)
+    if cache is not None and cache.directory is not None and cache_key is None:
+        raise ValueError("A persistent frame cache needs a cache_key describing the scene.")
+    if period and cache is None:
+        cache = FrameCache(None)  # Only shared by this export, so the scene needs no key
+        cache_key = cache_key or 'this export'
+    fig, update = scene()
+    canvas = prepare_canvas(fig, dpi)
+    size = canvas.get_width_height()
+    with stage('export.replay'):
+        for frame in range(start if replay else 0):
+            update(frame)
+
+    with FramePipe(filename, size, fps, output_args) as pipe:
+        for frame in range(start, stop):
+            key, buffer = None, None
+            if cache is not None:
+                key = cache.key(cache_key, frame % period if period else frame, size, dpi=dpi, transparent=transparent)
+                with stage('export.cache_get'):
+                    buffer = cache.get(key)
+            if buffer is not None:
+                count('export.cache_hits')
+                if replay:
+                    with stage('export.update'):
+                        update(frame)  # Skip the drawing, but keep sequential state moving
+            else:
+                with stage('export.update'):
+                    update(frame)
+                if transparent:
+                    _clear_background(fig)
+                with stage('export.draw'):
+                    canvas.draw()
+                buffer = canvas.buffer_rgba()
+                if cache is not None:
+                    with stage('export.cache_put'):
+                        cache.put(key, buffer)
+            with stage('export.encode'):
+                pipe.write(buffer)
+        with stage('export.encode'):
+            pipe.close()
+    return filename
+
+
+def _split(frames: int, parts: int) -> List[Tuple[int, int]]:
+    bounds = [frames * i // parts for i in range(parts + 1)]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def concat_segments(segments: Sequence[str], filename: str):
+    """Join encoded segments without re-encoding (ffmpeg's concat demuxer with stream copy)."""
+    import matplotlib
+    listing = filename + '.segments.txt'
+    with open(listing, 'w') as f:
+        f.writelines("file '%s'\n" % os.path.abspath(s).replace("'", r"'\''") for s in segments)
+    try:
+        subprocess.run([matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                        '-f', 'concat', '-safe', '0', '-i', listing, '-c', 'copy', filename],
+                       check=True, capture_output=True)
+    finally:
+        os.remove(listing)
+
+
+@dataclass
+class ExportJob:
+    """One video for export_many. Fields mirror the arguments of export_video."""
+    scene: Scene
+    frames: int
+    filename: str
+    fps: float = 30
+    dpi: float = 180
+    output_args: Sequence[str] = tuple(H264)
+    transparent: bool = False
+    replay: bool = True
+    cache: FrameCache | None = None
+    cache_key: str | None = None
+    period: int | None = None
+
+    def render(self, start, stop, filename):
+        return render_frames(self.scene, start, stop, filename, self.fps, self.dpi, self.output_args,
+                             self.transparent, self.replay, self.cache, self.cache_key, self.period)
+
+
+def export_many(jobs: Sequence[ExportJob], workers: int | None = None):
+    """
+    Export several videos at once over one process pool. Cores are shared between the jobs; a job
+    given more than one core is split into chunks that are encoded separately and concatenated.
+    With a single worker everything renders in-process, so scenes need not be picklable.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        return [job.render(0, job.frames, job.filename) for job in jobs]
+
+    per_job = max(1, workers // len(jobs))
+    tmps, segments = [], []
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = []
+            for job in jobs:
+                chunks = _split(job.frames, min(per_job, job.frames))
+                if len(chunks) == 1:
+                    names = [job.filename]
+                else:
+                    ext = os.path.splitext(job.filename)[1]
+                    tmps.append(tempfile.mkdtemp(prefix='.export_', dir=os.path.dirname(os.path.abspath(job.filename))))
+                    names = [os.path.join(tmps[-1], 'segment_%03d%s' % (i, ext)) for i in range(len(chunks))]
+                segments.append(names)
+                pending += [pool.submit(job.render, start, stop, name) for (start, stop), name in zip(chunks, names)]
+            for future in pending:
+                future.result()
+
+        for job, names in zip(jobs, segments):
+            if len(names) > 1:
+                concat_segments(names, job.filename)
+    finally:
+        for tmp in tmps:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return [job.filename for job in jobs]
+
+
+def export_video(scene: Scene, frames: int, filename: str, fps: float = 30, dpi: float = 180,
+                 output_args: Sequence[str] = H264, transparent: bool = False, replay: bool = True,
+                 workers: int | None = 1, cache: FrameCache | None = None, cache_key: str | None = None,
+                 period: int | None = None):
+    """
+    Offscreen replacement for FuncAnimation.save: frames are drawn with Agg and piped to ffmpeg as raw
+    RGBA, with no intermediate image files.
+
+    With workers > 1 (None for every core) the frame range is split into contiguous chunks, each encoded
+    to its own segment by a separate process, and the segments are concatenated losslessly.
+    See render_frames for `cache`, `cache_key` and `period`.
+    """
+    job = ExportJob(scene, frames, filename, fps, dpi, output_args, transparent, replay, cache, cache_key, period)
+    return export_many([job], workers)[0]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+def scene_key(*parts, **params) -> str:
+    """
+    Stable hash of whatever defines a scene's look: numbers, strings, lists, dicts, numpy arrays, and
+    functions or classes, which contribute their source code. Pass the scene's drawing code (its
+    build function, or the view class) so editing it invalidates the frames cached from it.
+    """
+    h = hashlib.sha256()
+
+    def feed(value):
+        if inspect.isfunction(value) or inspect.isclass(value) or inspect.ismethod(value):
+            try:
+                source = inspect.getsource(value).encode()
+            except (OSError, TypeError):  # Defined interactively; the bytecode is the next best thing
+                code = getattr(value, '__code__', None)
+                source = code.co_code + repr(code.co_consts).encode() if code else value.__qualname__.encode()
+            h.update(b'code%d' % len(source) + source)
+        elif isinstance(value, np.ndarray):
+            h.update(b'ndarray%s%s' % (str(value.dtype).encode(), str(value.shape).encode()))
+            h.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            for k in sorted(value):
+                feed(k)
+                feed(value[k])
+        elif isinstance(value, (list, tuple)):
+            h.update(b'[%d' % len(value))
+            for v in value:
+                feed(v)
+        else:
+            h.update(json.dumps(value, default=repr).encode())
+
+    feed(parts)
+    feed(params)
+    return h.hexdigest()
+
+
+class FrameCache:
+    """
+    Rendered frames stored as zlib-compressed RGBA buffers, keyed by scene hash, frame index and
+    output size. With a directory the cache persists between runs and evicts the least recently used
+    frames beyond max_bytes; with directory=None it is an in-memory LRU for a single export.
+    """
+
+    def __init__(self, directory: Optional[str] = '.frame_cache', max_bytes: int = 2 * 1024 ** 3, level: int = 1):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.level = level  # zlib level; 1 already shrinks mostly flat plot frames a lot
+        self._memory = OrderedDict()
+        self._size = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._size = sum(e.stat().st_size for e in os.scandir(directory) if e.name.endswith('.z'))
+
+    @staticmethod
+    def key(scene: str, frame: int, size, dpi, transparent: bool = False) -> str:
+        fields = (scene, frame, size[0], size[1], dpi, int(transparent))
+        return hashlib.sha256(('%s:%d:%dx%d:%r:%d' % fields).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.z')
+
+    def get(self, key) -> Optional[bytes]:
+        if self.directory is None:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+        else:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    blob = f.read()
+                os.utime(self._path(key))  # Recency for eviction
+            except FileNotFoundError:
+                return None
+        return None if blob is None else zlib.decompress(blob)
+
+    def put(self, key, buffer):
+        blob = zlib.compress(buffer, self.level)
+        if self.directory is None:
+            self._memory[key] = blob
+        else:
+            # Write then rename, so parallel workers never read a half-written frame.
+            tmp = self._path(key) + '.%d.tmp' % os.getpid()
+            with open(tmp, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, self._path(key))
+        self._size += len(blob)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self, target: Optional[int] = None):
+        """Drop least recently used frames until the cache is below `target` (default 90% of max_bytes)."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        if self.directory is None:
+            while self._memory and self._size > target:
+                _, blob = self._memory.popitem(last=False)
+                self._size -= len(blob)
+            return
+
+        # Other processes may share the directory, so recount from disk rather than trust _size.
+        entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(self.directory)
+                         if e.name.endswith('.z'))
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        self.evict(0)
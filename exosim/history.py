@@ -0,0 +1,152 @@
+from __future__ import annotations
+from typing import Tuple
+import numpy as np
+
+
+class GrowingBuffer:
+    """Append-only 2D float array. Capacity doubles when full, so appends are amortised O(1)."""
+
+    def __init__(self, width: int = 1, capacity: int = 1024, dtype=float):
+        self._data = np.empty((max(capacity, 1), width), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, needed):
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        if capacity != len(self._data):
+            grown = np.empty((capacity, self._data.shape[1]), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, row):
+        self._grow(self._size + 1)
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype).reshape(-1, self._data.shape[1])
+        self._grow(self._size + len(rows))
+        self._data[self._size:self._size + len(rows)] = rows
+        self._size += len(rows)
+
+    def truncate(self, size: int):
+        self._size = min(size, self._size)
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+class MinMaxDecimator:
+    """
+    Incremental min/max downsampler for an ever-growing (t, y) series.
+
+    Samples are folded into buckets of `stride` samples, each remembering its lowest and highest
+    point. Once there are twice as many buckets as requested, neighbouring buckets are merged and the
+    stride doubles. The output therefore never exceeds ~4 * n_buckets points while still showing
+    every extreme, which is what a line rasterised at n_buckets pixel columns would show anyway.
+    """
+
+    def __init__(self, n_buckets: int):
+        if n_buckets < 1:
+            raise ValueError("n_buckets must be at least 1.")
+        self.n_buckets = n_buckets
+        self.stride = 1  # Raw samples per bucket
+        self._buckets = GrowingBuffer(4, 2 * n_buckets + 1)  # Rows of (t_min, y_min, t_max, y_max)
+        self._open = np.zeros(4)  # The bucket currently being filled
+        self._count = 0
+
+    def append(self, t, y):
+        if self._count == 0:
+            self._open[:] = t, y, t, y
+        else:
+            if y < self._open[1]:
+                self._open[:2] = t, y
+            if y > self._open[3]:
+                self._open[2:] = t, y
+        self._count += 1
+
+        if self._count == self.stride:
+            self._buckets.append(self._open)
+            self._count = 0
+            if len(self._buckets) >= 2 * self.n_buckets:
+                self._merge()
+
+    def extend(self, ts, ys):
+        for t, y in zip(ts, ys):
+            self.append(t, y)
+
+    def _merge(self):
+        b = self._buckets.data
+        left, right = b[0::2], b[1::2]
+        merged = np.empty_like(left)
+        take_left = left[:, 1] <= right[:, 1]
+        merged[:, :2] = np.where(take_left[:, None], left[:, :2], right[:, :2])
+        take_left = left[:, 3] >= right[:, 3]
+        merged[:, 2:] = np.where(take_left[:, None], left[:, 2:], right[:, 2:])
+
+        self._buckets.truncate(0)
+        self._buckets.extend(merged)
+        self.stride *= 2
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray]:
+        b = self._buckets.data
+        if self._count:
+            b = np.vstack([b, self._open])
+
+        # Emit each bucket's extremes in time order so the line doesn't zig-zag backwards.
+        first_is_min = b[:, 0] <= b[:, 2]
+        first = np.where(first_is_min[:, None], b[:, :2], b[:, 2:])
+        second = np.where(first_is_min[:, None], b[:, 2:], b[:, :2])
+        pts = np.empty((2 * len(b), 2))
+        pts[0::2] = first
+        pts[1::2] = second
+        return pts[:, 0], pts[:, 1]
+
+
+class HistoryLine:
+    """
+    A single persistent Line2D fed with (t, y) samples. The raw history is kept in a GrowingBuffer,
+    while only a screen-resolution min/max summary is handed to matplotlib, so refreshing costs the
+    same after ten samples or ten million.
+
+    Without an explicit `resolution` the decimator gets one bucket per pixel column of the axes,
+    measured at the first sample, so exports that set the dpi after building the figure (see
+    export.prepare_canvas) are measured at their final size.
+    """
+
+    def __init__(self, ax, *args, resolution: int | None = None, **kwargs):
+        self.ax = ax
+        self.resolution = resolution
+        self.buffer = GrowingBuffer(2)
+        self._decimator = None
+        self.line, = ax.plot([], [], *args, **kwargs)
+
+    @property
+    def decimator(self) -> MinMaxDecimator:
+        if self._decimator is None:
+            resolution = self.resolution or int(self.ax.get_window_extent().width) or 512
+            self._decimator = MinMaxDecimator(resolution)
+        return self._decimator
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append(self, t, y):
+        self.buffer.append((t, y))
+        self.decimator.append(t, y)
+
+    def extend(self, ts, ys):
+        self.buffer.extend(np.column_stack([ts, ys]))
+        self.decimator.extend(ts, ys)
+
+    def refresh(self, autoscale: bool = True):
+        self.line.set_data(*self.decimator.points())
+        if autoscale:
+            self.ax.relim()
+            self.ax.autoscale_view()
+        return self.line
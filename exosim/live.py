@@ -0,0 +1,172 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from exosim.profiling import stage
+
+
+def snapshot_two_body(system, step):
+    return step, system.ax.copy(), system.bx.copy()
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Steps `system` on a background thread, pushing a snapshot of every step into a bounded queue.
+    When the queue is full the physics waits for the viewer, so memory stays bounded.
+
+    The simulation is paced to steps_per_second, or to sim_speed simulated seconds per wall-clock
+    second when that is given. The default of 30 steps a second is one step per frame at
+    LiveViewer's default frame rate, the pace of the old loops that drew and paused after every
+    step. steps_per_second=None runs as fast as the physics allows.
+    """
+
+    def __init__(self, system, dt, steps: Optional[int] = None, maxsize: int = 1024,
+                 snapshot: Callable = snapshot_two_body, steps_per_second: Optional[float] = 30,
+                 sim_speed: Optional[float] = None):
+        super().__init__(daemon=True)
+        self.system = system
+        self.dt = dt
+        self.steps = steps  # None runs until stop()
+        self.snapshot = snapshot
+        self.steps_per_second = sim_speed / dt if sim_speed is not None else steps_per_second
+        if self.steps_per_second is not None and self.steps_per_second <= 0:
+            raise ValueError("The simulation rate must be positive.")
+        self.states = queue.Queue(maxsize)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        step = 0
+        due = time.perf_counter()
+        while not self._stop_event.is_set() and (self.steps is None or step < self.steps):
+            if self.steps_per_second:
+                wait = due - time.perf_counter()
+                if wait > 0 and self._stop_event.wait(wait):
+                    break
+                if wait < -0.25:
+                    # Fell well behind (e.g. the window was being dragged): carry on at the set rate
+                    # instead of bursting through the backlog.
+                    due = time.perf_counter()
+                due += 1 / self.steps_per_second
+            with stage('live.physics'):
+                self.system.update(self.dt)
+            step += 1
+            state = self.snapshot(self.system, step)
+            while not self._stop_event.is_set():
+                try:
+                    self.states.put(state, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def stop(self):
+        self._stop_event.set()
+
+    def drain(self) -> List:
+        """Every state produced since the last call, oldest first."""
+        states = []
+        while True:
+            try:
+                states.append(self.states.get_nowait())
+            except queue.Empty:
+                return states
+
+    @property
+    def finished(self):
+        return not self.is_alive() and self.states.empty()
+
+
+class LiveViewer:
+    """
+    Shows a SimulationWorker's states while the physics runs on the worker thread: at most max_fps
+    times a second, only the registered (animated) artists are redrawn over a cached background. The
+    background is recaptured whenever matplotlib does a full draw (resize, rotate, zoom).
+
+    Artists added with keep=True are drawn into the background after each frame, so points that
+    should stay on screen only need the new ones set on them. A full draw loses what was kept, so
+    `on_redraw` is then called first to put the whole history on ordinary (non-animated) artists.
+    """
+
+    def __init__(self, fig, max_fps: float = 30, on_redraw: Optional[Callable[[], object]] = None):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.max_fps = max_fps
+        self.on_redraw = on_redraw
+        self._artists = []
+        self._kept = []
+        self._background = None
+        self._drawing = False
+        self._cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_artists(self, *artists, keep: bool = False):
+        for artist in artists:
+            artist.set_animated(True)
+            (self._kept if keep else self._artists).append(artist)
+
+    def invalidate(self):
+        """Force a full redraw on the next blit, e.g. after changing the axes limits."""
+        self._background = None
+
+    def _on_draw(self, event):
+        if self.on_redraw is not None and not self._drawing:
+            # Drawn by matplotlib (e.g. a resize) without the history: redo it on the next blit.
+            self._background = None
+            return
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        if self._kept:
+            for artist in self._kept:
+                self.fig.draw_artist(artist)
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._artists:
+            self.fig.draw_artist(artist)
+
+    def blit(self):
+        if self._background is None:
+            if self.on_redraw is not None:
+                self.on_redraw()
+            self._drawing = True
+            try:
+                self.canvas.draw()  # Triggers _on_draw, which grabs the background
+            finally:
+                self._drawing = False
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+    def run(self, worker: SimulationWorker, on_states: Callable[[List], object]):
+        """
+        Start `worker` and consume its states until it finishes or the window is closed. on_states gets
+        every state since the previous frame (oldest first) and should update the artists from them.
+        """
+        from matplotlib import pyplot as plt
+        plt.show(block=False)
+        worker.start()
+        period = 1 / self.max_fps
+        try:
+            while plt.fignum_exists(self.fig.number) and not worker.finished:
+                started = time.perf_counter()
+                states = worker.drain()
+                if states:
+                    with stage('live.artists'):
+                        on_states(states)
+                    with stage('live.blit'):
+                        self.blit()
+                # Let the GUI handle events for the rest of the frame budget instead of sleeping.
+                remaining = period - (time.perf_counter() - started)
+                with stage('live.events'):
+                    self.canvas.start_event_loop(max(remaining, 1e-3))
+        finally:
+            worker.stop()
+            self.canvas.mpl_disconnect(self._cid)
+            for artist in self._artists + self._kept:
+                artist.set_animated(False)
+            if self.on_redraw is not None:
+                self.on_redraw()
+                self.canvas.draw_idle()
+
@@ -0,0 +1,140 @@
+import math
+import numpy as np
+
+
+def get_orbit_position(t, orbit_time, distance):
+    # Circular orbit seen from above; the observer looks along +Y, so y < 0 is behind the star.
+    angle = 2 * np.pi * (t % orbit_time) / orbit_time
+    x = distance * np.cos(angle-np.pi/2)
+    y = distance * np.sin(angle-np.pi/2)
+    return x, y
+
+
+def _light_intensity_scalar(x, y, sun_radius, exp_radius):
+    # Calculate the distance between the sun and the exoplanet centers
+    if abs(x)>(sun_radius+exp_radius) or y<0:
+        # No overlap, full light intensity
+        return 1.0
+    elif abs(x)<=abs(sun_radius-exp_radius):
+        # Full overlap (exoplanet completely covers part of the sun)
+        overlap_area = math.pi * min(sun_radius, exp_radius) ** 2
+    else:
+        # Partial overlap, calculate using circle overlap formula
+        dist_centers = abs(x)
+        d1 = (sun_radius**2 - exp_radius**2 + dist_centers**2)/(2*dist_centers)
+        d2 = dist_centers - d1
+
+        # Clamped, since at first and second contact rounding can push d1/R or d2/r just past +-1.
+        left_side = sun_radius**2*math.acos(min(1.0, max(-1.0, d1/sun_radius))) - d1*math.sqrt(max(0.0, sun_radius**2 - d1**2))
+        right_side = exp_radius**2*math.acos(min(1.0, max(-1.0, d2/exp_radius))) - d2*math.sqrt(max(0.0, exp_radius**2 - d2**2))
+        overlap_area = left_side + right_side
+
+    # Calculate intensity as remaining light after overlap
+    return 1 - overlap_area / (math.pi * sun_radius ** 2)
+
+
+def calculate_light_intensity(x, y, sun_radius, exp_radius, dtype=np.float64):
+    """
+    Fraction of the star's light reaching the observer with the exoplanet at (x, y). Accepts scalars
+    (returning a float) or arrays of positions (returning an array), in which case the radii may be
+    arrays too, broadcasting against the positions.
+
+    With dtype=np.float32 arrays are computed and returned in float32, for long light curves where
+    memory matters more than the last digits; exosim.precision.check_light_curve measures the error.
+    """
+    if np.ndim(x) == 0 and np.ndim(y) == 0:
+        # Per-frame callers pass plain numbers; numpy's per-call overhead would dominate there.
+        return _light_intensity_scalar(float(x), float(y), sun_radius, exp_radius)
+
+    if np.dtype(dtype) == np.float32:
+        # Work in units of the star's radius, so float32 handles O(1) values whatever the units.
+        x = (np.asarray(x, dtype=float) / sun_radius).astype(dtype)
+        y = np.asarray(y, dtype=float).astype(dtype)
+        sun_radius, exp_radius = dtype(1), dtype(exp_radius / sun_radius)
+    else:
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    shape = np.broadcast(x, y, sun_radius, exp_radius).shape
+    dist_centers = np.broadcast_to(np.abs(x), shape)
+    overlap_area = np.zeros(shape, dtype=x.dtype)
+
+    # No overlap (full light intensity) when apart or behind the star.
+    in_front = np.broadcast_to(y >= 0, shape)
+    full = in_front & (dist_centers <= np.abs(sun_radius - exp_radius))
+    partial = in_front & ~full & (dist_centers <= sun_radius + exp_radius)
+
+    # Full overlap (exoplanet completely covers part of the sun)
+    overlap_area[full] = np.broadcast_to(np.pi * np.minimum(sun_radius, exp_radius) ** 2, shape)[full]
+
+    # Partial overlap, calculate using circle overlap formula. Radii may differ per position.
+    d = dist_centers[partial]
+    rs, re = np.broadcast_to(sun_radius, shape)[partial], np.broadcast_to(exp_radius, shape)[partial]
+    d1 = (rs**2 - re**2 + d**2)/(2*d)
+    d2 = d - d1
+    # Clamped as in _light_intensity_scalar, so contact points don't come out as NaN.
+    left_side = rs**2*np.arccos(np.clip(d1/rs, -1, 1)) - d1*np.sqrt(np.maximum(rs**2 - d1**2, 0))
+    right_side = re**2*np.arccos(np.clip(d2/re, -1, 1)) - d2*np.sqrt(np.maximum(re**2 - d2**2, 0))
+    overlap_area[partial] = left_side + right_side
+
+    # Calculate intensity as remaining light after overlap
+    intensity = 1 - overlap_area / (np.pi * sun_radius ** 2)
+    return intensity.astype(x.dtype, copy=False)
+
+
+def transit_light_curve(trajectory, times, sun_radius, exp_radius, dtype=np.float64):
+    """
+    Light curve at any cadence from a recorded two-body Trajectory, with body A as the star and body B
+    as the exoplanet. Positions at `times` are interpolated (Trajectory.at), so the integrator step
+    and the cadence are independent. Uses the same viewing geometry as get_orbit_position.
+    """
+    positions, _ = trajectory.at(times)
+    relative = positions[..., 1, :].astype(float) - positions[..., 0, :]
+    return calculate_light_intensity(relative[..., 0], relative[..., 1], sun_radius, exp_radius, dtype)
+
+
+def transit_windows(orbit_time, distance, sun_radius, exp_radius, start, stop):
+    """
+    (n, 2) array of [begin, end] times of every transit of a get_orbit_position orbit overlapping
+    [start, stop]. The planet is in front of the star at mid-orbit (t = orbit_time / 2 + k orbit_time)
+    and touches the disk while |x| = distance |sin(angle)| <= sun_radius + exp_radius; outside these
+    windows calculate_light_intensity is exactly 1.
+    """
+    reach = (sun_radius + exp_radius) / distance
+    # Beyond reach >= 1 the planet overlaps the disk for the whole half orbit in front of it.
+    half_width = orbit_time / (2 * np.pi) * (math.asin(reach) if reach < 1 else np.pi / 2)
+    half_width *= 1 + 1e-9  # Keep samples right at contact inside; the model gives them 1 anyway
+    first = math.floor((start + half_width) / orbit_time - 0.5)
+    last = math.ceil((stop - half_width) / orbit_time - 0.5)
+    centres = (np.arange(first, last + 1) + 0.5) * orbit_time
+    windows = np.stack([centres - half_width, centres + half_width], -1)
+    return windows[(windows[:, 1] >= start) & (windows[:, 0] <= stop)]
+
+
+def in_transit(t, windows):
+    """Indices of the times t falling inside any of the windows (from transit_windows)."""
+    t = np.asarray(t, dtype=float)
+    if t.ndim != 1 or np.any(t[1:] < t[:-1]):
+        order = np.argsort(t.ravel(), kind='stable')
+        return order[in_transit(t.ravel()[order], windows)]
+    # Sorted times: every window is one contiguous run of samples, found by bisection.
+    lo = np.searchsorted(t, windows[:, 0], side='left')
+    counts = np.searchsorted(t, windows[:, 1], side='right') - lo
+    counts = np.maximum(counts, 0)
+    return np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+def orbit_light_curve(t, orbit_time, distance, sun_radius, exp_radius, dtype=np.float64):
+    """
+    calculate_light_intensity(*get_orbit_position(t, orbit_time, distance), sun_radius, exp_radius)
+    for an array of times, evaluating the model only inside the transit windows and filling the rest
+    with the baseline flux of 1, so the cost scales with the transit duty cycle rather than the
+    number of samples. The result is identical to evaluating every sample.
+    """
+    t = np.asarray(t, dtype=float)
+    flux = np.ones(t.shape, dtype=dtype)
+    if not t.size:
+        return flux
+    windows = transit_windows(orbit_time, distance, sun_radius, exp_radius, t.min(), t.max())
+    inside = np.unravel_index(in_transit(t, windows), t.shape)
+    x, y = get_orbit_position(t[inside], orbit_time, distance)
+    flux[inside] = calculate_light_intensity(x, y, sun_radius, exp_radius, dtype)
+    return flux
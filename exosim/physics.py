@@ -0,0 +1,230 @@
+import numpy as np
+
+G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
+
+
+def _per_system(value):
+    # Masses of an ensemble get a trailing axis so they broadcast against (n, dims) vectors.
+    return value if np.ndim(value) == 0 else np.asarray(value, dtype=float)[..., None]
+
+
+class OscilatingSystem:
+    """
+    Two bodies under mutual gravity, stepped with semi-implicit Euler.
+
+    Any of the parameters may carry a leading ensemble shape: masses and distances of shape (n,) and
+    velocities of shape (n, dims) step n independent systems at once, with ax, bx, av, bv of shape
+    (n, dims).
+    """
+    G = G
+
+    def __init__(self, ma, mb, d, a_init_v = (0, 0, 15), b_init_v = (0, 1022, 0)):
+        self.ma = ma  # The mass of body A
+        self.mb = mb  # The mass of body B
+        self.d = d  # The distance between both
+
+        # Body A starts at the origin, body B d meters along X. Dimensions follow the velocities.
+        self.ax, self.bx, self.av, self.bv = _initial_state(ma, mb, d, a_init_v, b_init_v)
+        self._ma, self._mb = _per_system(ma), _per_system(mb)
+        self.get_a_pos = lambda: self.ax
+        self.get_b_pos = lambda: self.bx
+
+    def gravitational_force(self):
+        r = self.bx - self.ax
+        if r.ndim == 1:
+            dist = np.linalg.norm(r)
+            if dist == 0:
+                _coincide()
+        else:
+            dist = np.linalg.norm(r, axis=-1, keepdims=True)
+            if not dist.all():
+                _coincide()
+        force = self.G * self._ma * self._mb / dist ** 2
+        direction = r / dist
+        return force * direction
+
+    def update(self, dt):
+        F_ab = self.gravitational_force()
+        F_ba = -F_ab  # act-react
+
+        # Note that F/m = accel
+        self.av += F_ab / self._ma * dt
+        self.bv += F_ba / self._mb * dt
+
+        self.ax += self.av * dt
+        self.bx += self.bv * dt
+
+
+class OscilatingSystem2D(OscilatingSystem):
+    def __init__(self, ma, mb, d, a_init_v = (0, 0), b_init_v = (0, 1022)):
+        super().__init__(ma, mb, d, a_init_v, b_init_v)
+
+
+class OscilatingSystem32(OscilatingSystem):
+    """
+    OscilatingSystem storing its state in float32, for ensembles where memory and bandwidth matter more
+    than the last digits.
+
+    Positions and velocities are kept in float32 relative to the centre of mass, which stays within
+    the orbit's scale however far the system drifts; the centre of mass itself moves uniformly and
+    is tracked in float64. Forces are evaluated in float64, since G * ma * mb overflows float32.
+    ax, bx, av, bv are float32 arrays computed on access.
+
+    Use exosim.precision.check_system to measure the error against a float64 run.
+    """
+    dtype = np.float32
+
+    def __init__(self, ma, mb, d, a_init_v = (0, 0, 15), b_init_v = (0, 1022, 0)):
+        self.ma, self.mb, self.d = ma, mb, d
+        ax, bx, av, bv = _initial_state(ma, mb, d, a_init_v, b_init_v)
+        self._ma, self._mb = _per_system(ma), _per_system(mb)
+        total = self._ma + self._mb
+        self.com = (self._ma * ax + self._mb * bx) / total
+        self.com_v = (self._ma * av + self._mb * bv) / total
+        self.ra, self.rb = (ax - self.com).astype(self.dtype), (bx - self.com).astype(self.dtype)
+        self.va, self.vb = (av - self.com_v).astype(self.dtype), (bv - self.com_v).astype(self.dtype)
+        self.get_a_pos = lambda: self.ax
+        self.get_b_pos = lambda: self.bx
+
+    @property
+    def ax(self):
+        return (self.com + self.ra).astype(self.dtype)
+
+    @property
+    def bx(self):
+        return (self.com + self.rb).astype(self.dtype)
+
+    @property
+    def av(self):
+        return (self.com_v + self.va).astype(self.dtype)
+
+    @property
+    def bv(self):
+        return (self.com_v + self.vb).astype(self.dtype)
+
+    def gravitational_force(self):
+        r = (self.rb - self.ra).astype(float)
+        dist = np.linalg.norm(r, axis=-1, keepdims=True)
+        if not dist.all():
+            _coincide()
+        return self.G * self._ma * self._mb / dist ** 2 * (r / dist)
+
+    def update(self, dt):
+        F_ab = self.gravitational_force()
+        self.va += (F_ab / self._ma * dt).astype(self.dtype)
+        self.vb -= (F_ab / self._mb * dt).astype(self.dtype)
+        self.ra += self.va * self.dtype(dt)
+        self.rb += self.vb * self.dtype(dt)
+        self.com += self.com_v * dt
+
+
+class NBodySystem:
+    """
+    N bodies under mutual gravity, stepped with semi-implicit Euler like OscilatingSystem. Forces are
+    summed over all pairs, so this suits up to a few thousand bodies.
+
+    After every step, bodies closer than close_distance and bodies whose radii overlap are found
+    with a spatial hash (exosim.encounters) and reported once per approach as Encounter events in
+    self.events. With merge=True colliding bodies become one, conserving mass and momentum (radii
+    combine by volume); otherwise `softening` keeps forces finite through close passes.
+    """
+    G = G
+
+    def __init__(self, masses, positions, velocities, radii=None, close_distance: float = 0.0,
+                 softening: float = 0.0, merge: bool = False):
+        self.masses = np.array(masses, dtype=float)
+        self.x = np.array(positions, dtype=float)
+        self.v = np.array(velocities, dtype=float)
+        self.radii = None if radii is None else np.array(radii, dtype=float)
+        if self.x.shape != self.v.shape or self.x.shape[:1] != self.masses.shape:
+            raise ValueError("Expected masses (n,) and positions and velocities (n, dims).")
+        if merge and radii is None:
+            raise ValueError("Merging needs radii.")
+        self.close_distance = close_distance
+        self.softening = softening
+        self.merge = merge
+        self.ids = np.arange(len(self.masses))  # Stable across merges, for events
+        self.time = 0.0
+        self.events = []
+        self._close = {}  # Id pairs currently in a reported encounter, and its kind
+        if self.close_distance > 0 or self.radii is not None:
+            self.detect()  # Bodies may already be close, or overlap, at the start
+
+    def accelerations(self):
+        r = self.x[None, :, :] - self.x[:, None, :]  # r[i, j] points from i to j
+        dist2 = (r * r).sum(axis=-1) + self.softening ** 2
+        np.fill_diagonal(dist2, np.inf)
+        if not self.softening and not dist2.all():
+            i, j = np.argwhere(dist2 == 0)[0]
+            raise ValueError(f"Bodies {self.ids[i]} and {self.ids[j]} coincide; the force between them is "
+                             "undefined. Use softening, or radii with merge=True.")
+        return self.G * (r * (self.masses[None, :] / dist2 ** 1.5)[..., None]).sum(axis=1)
+
+    def update(self, dt):
+        self.v += self.accelerations() * dt
+        self.x += self.v * dt
+        self.time += dt
+        if self.close_distance > 0 or self.radii is not None:
+            self.detect()
+
+    def detect(self):
+        """Record new encounters (and merge collisions, if enabled) at the current positions."""
+        from exosim.encounters import Encounter, close_pairs
+        i, j, separation = close_pairs(self.x, self.close_distance, self.radii)
+        touching = np.zeros(len(i), dtype=bool) if self.radii is None else separation <= self.radii[i] + self.radii[j]
+        current = {}
+        merges = []
+        for a, b, d, hit in zip(i, j, separation, touching):
+            pair = (int(self.ids[a]), int(self.ids[b]))
+            kind = 'collision' if hit else 'close'
+            current[pair] = kind
+            # Report approaches when they start, and again if they turn into a collision.
+            if self._close.get(pair) not in (kind, 'collision'):
+                self.events.append(Encounter(self.time, pair[0], pair[1], float(d), kind, bool(hit and self.merge)))
+            if hit and self.merge:
+                merges.append((a, b))
+        self._close = current
+        if merges:
+            self._merge(merges)
+
+    def _merge(self, pairs):
+        # Union the colliding groups, then fold each group into its lowest index.
+        parent = list(range(len(self.masses)))
+
+        def root(k):
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        for a, b in pairs:
+            ra, rb = root(a), root(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        roots = np.array([root(k) for k in range(len(parent))])
+        m = self.masses
+        mass = np.bincount(roots, m)
+        momentum = np.stack([np.bincount(roots, m * self.v[:, d]) for d in range(self.v.shape[1])], -1)
+        centre = np.stack([np.bincount(roots, m * self.x[:, d]) for d in range(self.x.shape[1])], -1)
+        volume = np.bincount(roots, self.radii ** 3)
+        keep = roots == np.arange(len(roots))
+        self.masses = mass[keep]
+        self.v = momentum[keep] / self.masses[:, None]
+        self.x = centre[keep] / self.masses[:, None]
+        self.radii = np.cbrt(volume[keep])
+        self.ids = self.ids[keep]
+        self._close = {pair: kind for pair, kind in self._close.items() if pair[0] in self.ids and pair[1] in self.ids}
+
+
+def _coincide():
+    # Coincident bodies would otherwise turn the state into NaN without a word.
+    raise ValueError("The bodies coincide; the gravitational force between them is undefined.")
+
+
+def _initial_state(ma, mb, d, a_init_v, b_init_v):
+    av, bv = np.array(a_init_v, dtype=float), np.array(b_init_v, dtype=float)
+    shape = np.broadcast_shapes(np.shape(ma), np.shape(mb), np.shape(d), av.shape[:-1], bv.shape[:-1])
+    shape += av.shape[-1:]
+    ax, bx = np.zeros(shape, dtype=float), np.zeros(shape, dtype=float)
+    bx[..., 0] = d
+    return ax, bx, np.broadcast_to(av, shape).copy(), np.broadcast_to(bv, shape).copy()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Dict, Sequence, Tuple
+
+from exosim.export import ExportJob, H264, export_many
+from exosim.frame_cache import FrameCache, scene_key
+from exosim.history import HistoryLine, MinMaxDecimator
+from exosim.trajectory import Trajectory
+
+
+# Views are picklable scenes over a precomputed Trajectory: calling one builds a figure with
+# persistent artists and returns it with update(frame). Nothing is simulated while rendering, so
+# any number of views can be rendered side by side from the same arrays.
+
+class SystemView:
+    """Top-down view of both bodies, with lines from body A to fixed reference points."""
+
+    def __init__(self, trajectory: Trajectory, references: Sequence[Tuple[float, float]] = (),
+                 lim: float = 8e9, figsize=(6, 6)):
+        self.trajectory = trajectory
+        self.references = list(references)
+        self.lim = lim
+        self.figsize = figsize
+
+    @property
+    def cache_key(self):
+        return scene_key(type(self), self.trajectory.positions, self.references, self.lim, self.figsize)
+
+    def __call__(self):
+        from matplotlib import pyplot as plt
+        a, b = self.trajectory.a, self.trajectory.b
+        fig, ax = plt.subplots(figsize=self.figsize)
+        distances = [ax.plot([a[0, 0], ref[0]], [a[0, 1], ref[1]], 'g-')[0] for ref in self.references]
+        ax.set_xlim([-self.lim, self.lim])
+        ax.set_ylim([-self.lim, self.lim])
+        replots = [ax.scatter(*pt) for pt in [a[0, :2], b[0, :2]] + self.references]
+
+        def update(frame):
+            replots[0].set_offsets(a[frame, :2])
+            replots[1].set_offsets(b[frame, :2])
+            for line, ref in zip(distances, self.references):
+                line.set_data([a[frame, 0], ref[0]], [a[frame, 1], ref[1]])
+            return distances + replots
+
+        return fig, update
+
+
+class HistoryView:
+    """Displacement of one body along one axis over time, drawn as a single downsampled line."""
+
+    def __init__(self, trajectory: Trajectory, body: int = 0, axis: int = 0, ylabel: str = None,
+                 figsize=(6, 6), fmt='o', **line_kwargs):
+        self.trajectory = trajectory
+        self.body, self.axis = body, axis
+        self.ylabel = ylabel or "%s Displacement (m)" % "XYZ"[axis]
+        self.figsize = figsize
+        self.fmt = fmt
+        self.line_kwargs = dict({'color': 'b', 'ls': ''}, **line_kwargs)
+
+    @property
+    def cache_key(self):
+        return scene_key(type(self), HistoryLine, MinMaxDecimator, self.trajectory.t,
+                         self.trajectory.positions[:, self.body, self.axis],
+                         self.ylabel, self.figsize, self.fmt, self.line_kwargs)
+
+    def __call__(self):
+        from matplotlib import pyplot as plt
+        t = self.trajectory.t
+        y = self.trajectory.positions[:, self.body, self.axis]
+        fig, ax = plt.subplots(figsize=self.figsize)
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(self.ylabel)
+        history = HistoryLine(ax, self.fmt, **self.line_kwargs)
+
+        def update(frame):
+            # Catch up from wherever the history is, so a worker can start mid-video.
+            history.extend(t[len(history):frame + 1], y[len(history):frame + 1])
+            return [history.refresh()]
+
+        return fig, update
+
+
+def render_views(views: Dict[str, object], frames: int = None, fps: float = 30, dpi: float = 180,
+                 output_args: Sequence[str] = H264, workers: int | None = None, cache: FrameCache | None = None):
+    """
+    Render every {filename: view} in one pass over a shared process pool. By default a view gets one
+    frame per state of its trajectory; Trajectory.record keeps the initial state too, so pass
+    trajectory[1:] for exactly one frame per step.
+    """
+    jobs = []
+    for filename, view in views.items():
+        n = len(view.trajectory) if frames is None else frames
+        jobs.append(ExportJob(view, n, filename, fps, dpi, output_args, replay=False, cache=cache))
+    return export_many(jobs, workers)
+
@@ -0,0 +1,84 @@
+"""
+Error checks for the float32 modes of the physics and photometry code, against float64 reference runs.
+"""
+from __future__ import annotations
+import copy
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+
+class PrecisionWarning(UserWarning):
+    pass
+
+
+@dataclass
+class PrecisionReport:
+    name: str
+    max_error: float  # Largest absolute difference from the float64 reference
+    scale: float  # What the error is measured against, e.g. the orbit's size
+    tolerance: float  # Largest acceptable max_error / scale
+
+    @property
+    def relative_error(self) -> float:
+        return self.max_error / self.scale if self.scale else float(self.max_error > 0)
+
+    @property
+    def ok(self) -> bool:
+        return self.relative_error <= self.tolerance
+
+    def __str__(self):
+        return "%s: float32 error %.3g relative to float64 (tolerance %.3g)%s" % (
+            self.name, self.relative_error, self.tolerance, '' if self.ok else ', TOO LARGE')
+
+
+def compare(name, values, reference, scale, tolerance, warn: bool = True) -> PrecisionReport:
+    """Report (and warn about, when beyond tolerance) the largest difference between two runs."""
+    diff = np.abs(np.asarray(values, dtype=float) - np.asarray(reference, dtype=float))
+    report = PrecisionReport(name, float(diff.max(initial=0)), float(scale), tolerance)
+    if warn and not report.ok:
+        warnings.warn(str(report), PrecisionWarning, stacklevel=3)
+    return report
+
+
+def check_system(system, dt, steps: int = 1000, tolerance: float = 1e-4, warn: bool = True) -> PrecisionReport:
+    """
+    Step a copy of float32 `system` and a float64 OscilatingSystem started from the same state side
+    by side for `steps` steps, and compare the positions relative to the largest separation seen.
+    `system` itself is not advanced.
+    """
+    from exosim.physics import OscilatingSystem
+    trial = copy.deepcopy(system)
+    reference = OscilatingSystem.__new__(OscilatingSystem)
+    reference.ma, reference.mb, reference.d = system.ma, system.mb, system.d
+    reference._ma, reference._mb = system._ma, system._mb
+    reference.ax, reference.bx = system.com + system.ra, system.com + system.rb
+    reference.av, reference.bv = system.com_v + system.va, system.com_v + system.vb
+
+    error, scale = 0.0, 0.0
+    for _ in range(steps):
+        trial.update(dt)
+        reference.update(dt)
+        for body, ref in ((trial.ax, reference.ax), (trial.bx, reference.bx)):
+            error = max(error, float(np.abs(body - ref).max()))
+        scale = max(scale, float(np.linalg.norm(reference.bx - reference.ax, axis=-1).max()))
+    return compare('two-body positions', error, 0.0, scale, tolerance, warn)
+
+
+def check_light_curve(x, y, sun_radius, exp_radius, tolerance: float = 1e-6, samples: int = 100000,
+                      warn: bool = True) -> PrecisionReport:
+    """
+    Compare calculate_light_intensity in float32 and float64 at (up to `samples` of) the positions
+    x, y. The error is in units of the star's full flux; float32 resolves about 6e-8 of it near 1,
+    well below photometric noise but a sizeable fraction of very shallow transits.
+    """
+    from exosim.photometry import calculate_light_intensity
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    x, y = x.ravel(), y.ravel()
+    if len(x) > samples:
+        pick = np.linspace(0, len(x) - 1, samples).astype(int)
+        x, y = x[pick], y[pick]
+    reference = calculate_light_intensity(x, y, sun_radius, exp_radius)
+    values = calculate_light_intensity(x, y, sun_radius, exp_radius, dtype=np.float32)
+    return compare('light curve', values, reference, 1.0, tolerance, warn)
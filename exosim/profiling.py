@@ -0,0 +1,155 @@
+"""
+Opt-in timing of simulation and animation loop stages.
+
+Wrap a stage with ``with stage('physics'): ...``. Nothing is measured unless profiling is enabled,
+either by calling profiler.enable() or by setting environment variables before starting a script:
+
+    EXOSIM_PROFILE=1                 time every stage and print a summary table on exit
+    EXOSIM_CPROFILE=run.prof         additionally run cProfile and dump its stats to run.prof
+
+When disabled, stage() hands back one shared no-op context manager, so instrumented loops pay
+a function call and nothing else.
+"""
+from __future__ import annotations
+import atexit
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+N_BUCKETS = 48  # Power-of-two nanosecond buckets, up to ~39 hours
+
+
+class StageStats:
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0  # ns
+        self.min = None
+        self.max = 0
+        self.buckets = [0] * N_BUCKETS  # buckets[k] counts durations in [2^(k-1), 2^k) ns
+
+    def add(self, ns: int):
+        self.count += 1
+        self.total += ns
+        self.min = ns if self.min is None else min(self.min, ns)
+        self.max = max(self.max, ns)
+        self.buckets[min(ns.bit_length(), N_BUCKETS - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper edge (ns) of the histogram bucket holding the q-th quantile."""
+        target = q * self.count
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return min(float(2 ** k), float(self.max))
+        return float(self.max)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()  # Stages are timed from the live viewer's worker thread too
+        self._cprofile = None
+        self._cprofile_path = None
+        self._registered = False
+
+    def enable(self, cprofile_path: Optional[str] = None, report_at_exit: bool = True):
+        self.enabled = True
+        if cprofile_path and self._cprofile is None:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile_path = cprofile_path
+            self._cprofile.enable()
+        if report_at_exit and not self._registered:
+            atexit.register(self.report)
+            self._registered = True
+
+    def disable(self):
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, ns: int):
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.add(ns)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> str:
+        rows = ["%-24s %9s %10s %10s %10s %10s %10s" % ('stage', 'calls', 'total s', 'mean ms', 'p50 ms',
+                                                      'p95 ms', 'max ms')]
+        for name, s in sorted(self.stages.items(), key=lambda item: -item[1].total):
+            rows.append("%-24s %9d %10.3f %10.3f %10.3f %10.3f %10.3f" % (
+                name, s.count, s.total / 1e9, s.total / s.count / 1e6, s.quantile(0.5) / 1e6,
+                s.quantile(0.95) / 1e6, s.max / 1e6))
+        for name, n in sorted(self.counters.items()):
+            rows.append("%-24s %9d" % (name, n))
+        return "\n".join(rows)
+
+    def report(self, file=None):
+        file = sys.stderr if file is None else file
+        if self.stages or self.counters:
+            print(self.summary(), file=file)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._cprofile_path)
+            print("cProfile stats written to %s" % self._cprofile_path, file=file)
+
+
+profiler = Profiler()
+stage = profiler.stage
+count = profiler.count
+
+if os.environ.get('EXOSIM_PROFILE', '0') != '0' or os.environ.get('EXOSIM_CPROFILE'):
+    profiler.enable(os.environ.get('EXOSIM_CPROFILE'))
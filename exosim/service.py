@@ -0,0 +1,258 @@
+"""
+Local HTTP service computing observables on demand, so notebooks and dashboards share one warm
+backend instead of re-running the scripts:
+
+    python -m exosim.service --port 8765              # compute on every core, 256 MB result cache
+
+    GET  /light_curve?orbit_time=10&distance=8.25&sun_radius=2&exp_radius=1.25&samples=600
+    POST /trajectory   {"ma": 6.4524e24, "mb": 4.348e23, "d": 84.4e7, "a_init_v": [0, 0], ...}
+    GET  /health
+
+Parameters are those of the batch scenario kinds (see exosim.batch); query-string values are
+parsed as JSON where possible. Responses are .npz archives (np.load(io.BytesIO(body))), or JSON
+errors with status 400 for bad parameters. fetch() does all of this from Python.
+
+Computation runs in a process pool. Identical requests arriving while one is being computed share
+its result, and results are kept in an LRU cache up to --cache-mb. The X-Cache response header
+says whether a result was computed ('miss'), shared with a concurrent request ('shared') or
+served from the cache ('hit'). The service binds to 127.0.0.1 by default and has no
+authentication, so don't expose it beyond the machine.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from exosim.profiling import count, stage
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+MAX_BODY = 1024 ** 2
+
+
+def _rv(params):
+    """Radial velocity of body A (positive receding) for an observer far along +Y."""
+    trajectory = _sampled(params)
+    return dict(t=trajectory.t, rv=-trajectory.velocities[:, 0, 1] * np.sin(params.get('inclination', np.pi / 2)))
+
+
+def _sampled(params):
+    # `cadence` (s) resamples the integration at that spacing, independent of dt.
+    from exosim.batch import simulate_trajectory
+    trajectory = simulate_trajectory(params)
+    if params.get('cadence'):
+        trajectory = trajectory.resample(np.arange(trajectory.t[0], trajectory.t[-1], params['cadence']))
+    return trajectory
+
+
+def _trajectory(params):
+    trajectory = _sampled(params)
+    return dict(t=trajectory.t, positions=trajectory.positions, velocities=trajectory.velocities)
+
+
+def _light_curve(params):
+    from exosim.batch import circular_light_curve
+    t, flux, _ = circular_light_curve(params)
+    return dict(t=t, flux=flux)
+
+
+OBSERVABLES = {'light_curve': _light_curve, 'rv': _rv, 'trajectory': _trajectory}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def compute(kind: str, params: Dict) -> bytes:
+    """Run in a worker: the observable as .npz bytes. Parameter mistakes come back as BadRequest."""
+    try:
+        arrays = OBSERVABLES[kind](params)
+    except (KeyError, ValueError, TypeError) as e:
+        raise BadRequest(f"{type(e).__name__}: {e}") from None
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+class ObservableService:
+    def __init__(self, workers: Optional[int] = None, cache_bytes: int = 256 * 1024 ** 2):
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count())
+        self.cache_bytes = cache_bytes
+        self.cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cached = 0
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self._jobs = set()  # Submitted to the pool and not finished, for close() to cancel
+        self.stats = dict(hit=0, shared=0, miss=0)
+
+    @staticmethod
+    def key(kind, params) -> str:
+        return json.dumps([kind, params], sort_keys=True)
+
+    async def get(self, kind: str, params: Dict):
+        """(npz bytes, 'hit' | 'shared' | 'miss') for an observable, computing it at most once at a time."""
+        key = self.key(kind, params)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self._count(self.cache[key], 'hit')
+        if key in self.in_flight:
+            return self._count(await asyncio.shield(self.in_flight[key]), 'shared')
+
+        job = self.pool.submit(compute, kind, params)
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        future = asyncio.wrap_future(job)
+        self.in_flight[key] = future
+        try:
+            with stage('service.compute'):
+                body = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key]
+        self._store(key, body)
+        return self._count(body, 'miss')
+
+    def _count(self, body, how):
+        self.stats[how] += 1
+        count('service.' + how)
+        return body, how
+
+    def _store(self, key, body):
+        if len(body) > self.cache_bytes:
+            return
+        self.cache[key] = body
+        self._cached += len(body)
+        while self._cached > self.cache_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self._cached -= len(evicted)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, headers, body = await self._respond(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:  # A bug, not a bad request; still answer and close the connection
+            status, headers, body = _error(500, f"{type(e).__name__}: {e}")
+        head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) != 3:
+            return _error(400, "Malformed request line.")
+        method, target, _ = request_line
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return _error(400, "Invalid Content-Length.")
+        if length > MAX_BODY:
+            return _error(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        kind = url.path.strip('/')
+        if kind == 'health':
+            info = dict(observables=sorted(OBSERVABLES), cached=len(self.cache), cached_bytes=self._cached,
+                        in_flight=len(self.in_flight), **self.stats)
+            return 200, {'Content-Type': 'application/json'}, json.dumps(info).encode()
+        if kind not in OBSERVABLES:
+            return _error(404, f"Unknown observable '{kind}'. Known: {', '.join(sorted(OBSERVABLES))}.")
+        if method not in ('GET', 'POST'):
+            return _error(405, "Use GET or POST.")
+
+        try:
+            params = {name: _parse_value(value) for name, value in parse_qsl(url.query)}
+            parsed = json.loads(body) if body else {}
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return _error(400, f"Request body is not valid JSON: {e}")
+        if not isinstance(parsed, dict):
+            return _error(400, "Request body must be a JSON object of parameters.")
+        params.update(parsed)
+        try:
+            data, how = await self.get(kind, params)
+        except BadRequest as e:
+            return _error(400, str(e))
+        except Exception as e:
+            return _error(500, f"{type(e).__name__}: {e}")
+        return 200, {'Content-Type': 'application/x-npz', 'X-Cache': how}, data
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        # shutdown(cancel_futures=True) would do this, but only from Python 3.9.
+        for job in list(self._jobs):
+            job.cancel()
+        self.pool.shutdown()
+
+
+def _parse_value(value):
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def _error(status, message):
+    return status, {'Content-Type': 'application/json'}, json.dumps(dict(error=message)).encode()
+
+
+def fetch(kind: str, host: str = '127.0.0.1', port: int = 8765, timeout: float = 600, **params) -> Dict[str, np.ndarray]:
+    """Request an observable from a running service. Returns its arrays; errors raise ValueError."""
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+    request = Request(f"http://{host}:{port}/{kind}", data=json.dumps(params).encode(),
+                      headers={'Content-Type': 'application/json'})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            body = response.read()
+    except HTTPError as e:
+        raise ValueError(json.loads(e.read()).get('error', str(e))) from None
+    with np.load(io.BytesIO(body)) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve simulated observables over HTTP on localhost.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-n', '--workers', type=int, default=None, help="compute processes (default: every core)")
+    parser.add_argument('--cache-mb', type=float, default=256, help="result cache size")
+    args = parser.parse_args(argv)
+
+    service = ObservableService(args.workers, int(args.cache_mb * 1024 ** 2))
+    print(f"Serving {', '.join(sorted(OBSERVABLES))} on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
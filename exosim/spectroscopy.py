@@ -0,0 +1,18 @@
+import numpy as np
+
+C = 299_792_458  # Speed of light (m/s)
+
+
+def doppler_factor(v):
+    """Observed over emitted wavelength for a source receding at radial velocity v (m/s; negative approaches)."""
+    ratio = np.asarray(v, dtype=float) / C
+    return ((1 + ratio) / (1 - ratio)) ** 0.5
+
+
+def line_shift(v, rest_wavelength):
+    """
+    Doppler shift of a spectral line, in the units of rest_wavelength. Computed as rest * (factor - 1)
+    via expm1/log1p, so the tiny shifts of stellar reflex motion survive in float32 storage.
+    """
+    ratio = np.asarray(v, dtype=float) / C
+    return rest_wavelength * np.expm1(0.5 * (np.log1p(ratio) - np.log1p(-ratio)))
@@ -0,0 +1,223 @@
+"""
+Chunked columnar storage for long simulation outputs (trajectories, light curves, RV series).
+
+A store is a directory holding one .npy file per column per chunk and a manifest.json:
+
+    run.store/
+        manifest.json          columns, dtypes, per-row shapes, and each chunk's row count and index range
+        t/000000.npy
+        positions/000000.npy
+        ...
+
+Rows are ordered by an index column (time, by default), so a range query only opens the chunks
+overlapping the range, memory-maps them and cuts them with searchsorted. Appends add whole chunks and
+rewrite the manifest last, so readers never see a partial chunk.
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from exosim.profiling import stage
+
+MANIFEST = 'manifest.json'
+VERSION = 1
+
+
+class ColumnStore:
+    def __init__(self, path: str, mode: str = 'r'):
+        if mode not in ('r', 'a'):
+            raise ValueError("mode must be 'r' or 'a'.")
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != VERSION:
+            raise ValueError(f"Unsupported store version {manifest.get('version')} in {path}.")
+        self.index = manifest['index']
+        self.chunk_rows = manifest['chunk_rows']
+        self.columns = {name: (np.dtype(spec['dtype']), tuple(spec['shape'])) for name, spec in manifest['columns'].items()}
+        self.chunks: List[Dict] = manifest['chunks']
+        self.attrs: Dict = manifest.get('attrs', {})
+        self._pending: Dict[str, List[np.ndarray]] = {name: [] for name in self.columns}
+        self._pending_rows = 0
+
+    @classmethod
+    def create(cls, path: str, columns: Dict[str, object], index: str = 't', chunk_rows: int = 65536,
+               attrs: Optional[Dict] = None, overwrite: bool = False) -> ColumnStore:
+        """
+        Make an empty store. `columns` maps names to a dtype, or to (dtype, row_shape) for columns with
+        more than one value per row, e.g. {'t': 'f8', 'positions': ('f8', (2, 3))}.
+        """
+        if index not in columns:
+            raise ValueError(f"The index column '{index}' must be one of the columns.")
+        if os.path.exists(os.path.join(path, MANIFEST)) and not overwrite:
+            raise ValueError(f"{path} already holds a store.")
+        specs = {}
+        for name, spec in columns.items():
+            dtype, shape = (spec, ()) if not isinstance(spec, (tuple, list)) else spec
+            specs[name] = dict(dtype=np.dtype(dtype).str, shape=list(shape))
+        if specs[index]['shape']:
+            raise ValueError("The index column must hold one value per row.")
+        os.makedirs(path, exist_ok=True)
+        for name in specs:
+            os.makedirs(os.path.join(path, name), exist_ok=True)
+        manifest = dict(version=VERSION, index=index, chunk_rows=chunk_rows, columns=specs, chunks=[],
+                        attrs=attrs or {})
+        _write_manifest(path, manifest)
+        return cls(path, 'a')
+
+    @classmethod
+    def write(cls, path: str, data: Dict[str, np.ndarray], index: str = 't', chunk_rows: int = 65536,
+              attrs: Optional[Dict] = None, overwrite: bool = False) -> ColumnStore:
+        """Create a store holding `data` ({name: array}), with column types taken from the arrays."""
+        data = {name: np.asarray(values) for name, values in data.items()}
+        store = cls.create(path, {name: (v.dtype, v.shape[1:]) for name, v in data.items()}, index, chunk_rows,
+                           attrs, overwrite)
+        store.append(**data)
+        store.flush()
+        return store
+
+    def __len__(self):
+        return sum(chunk['rows'] for chunk in self.chunks) + self._pending_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.mode == 'a':
+            self.flush()
+
+    @property
+    def span(self):
+        """(first, last) index value on disk, or None when empty."""
+        if not self.chunks:
+            return None
+        return self.chunks[0]['start'], self.chunks[-1]['stop']
+
+    def append(self, **data):
+        """
+        Add rows, given as one array per column. Rows are buffered and written out in chunks of
+        chunk_rows; call flush() (or use the store as a context manager) to write the remainder.
+        The index must not decrease, within the rows or relative to what is already stored.
+        """
+        if self.mode != 'a':
+            raise ValueError("Store was opened read-only.")
+        if set(data) != set(self.columns):
+            raise ValueError(f"append needs every column: {', '.join(self.columns)}.")
+        arrays = {}
+        rows = None
+        for name, (dtype, shape) in self.columns.items():
+            # Copied, since rows can sit in the buffer until a later flush and callers may reuse theirs.
+            values = np.array(data[name], dtype=dtype)
+            if values.shape[1:] != shape:
+                raise ValueError(f"Column '{name}' rows must have shape {shape}, got {values.shape[1:]}.")
+            if rows is not None and len(values) != rows:
+                raise ValueError("Every column must get the same number of rows.")
+            rows = len(values)
+            arrays[name] = values
+        if rows == 0:
+            return
+
+        index = arrays[self.index]
+        last = self._last_index()
+        if np.any(np.diff(index) < 0) or (last is not None and index[0] < last):
+            raise ValueError(f"The index column '{self.index}' must be non-decreasing.")
+
+        for name, values in arrays.items():
+            self._pending[name].append(values)
+        self._pending_rows += rows
+        if self._pending_rows >= self.chunk_rows:
+            self._write_pending(full_only=True)
+
+    def flush(self):
+        if self._pending_rows:
+            self._write_pending(full_only=False)
+
+    def _last_index(self):
+        pending = self._pending[self.index]
+        if pending:
+            return pending[-1][-1]
+        return self.chunks[-1]['stop'] if self.chunks else None
+
+    def _write_pending(self, full_only: bool):
+        merged = {name: np.concatenate(parts) for name, parts in self._pending.items()}
+        n = len(merged[self.index])
+        end = n - n % self.chunk_rows if full_only else n
+        for lo in range(0, end, self.chunk_rows):
+            hi = min(lo + self.chunk_rows, end)
+            chunk_id = self.chunks[-1]['id'] + 1 if self.chunks else 0
+            for name, values in merged.items():
+                np.save(os.path.join(self.path, name, '%06d.npy' % chunk_id), values[lo:hi])
+            index = merged[self.index]
+            self.chunks.append(dict(id=chunk_id, rows=hi - lo, start=index[lo].item(), stop=index[hi - 1].item()))
+        self._pending = {name: [values[end:]] if end < n else [] for name, values in merged.items()}
+        self._pending_rows = n - end
+        self._save_manifest()
+
+    def _save_manifest(self):
+        columns = {name: dict(dtype=dtype.str, shape=list(shape)) for name, (dtype, shape) in self.columns.items()}
+        _write_manifest(self.path, dict(version=VERSION, index=self.index, chunk_rows=self.chunk_rows,
+                                        columns=columns, chunks=self.chunks, attrs=self.attrs))
+
+    def iter_chunks(self, start=None, stop=None, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Memory-mapped slices of the stored rows with start <= index < stop (either end may be None),
+        one dict of {column: array} per overlapping chunk. Nothing is read until the arrays are used.
+        """
+        columns = list(self.columns) if columns is None else list(columns)
+        for name in columns:
+            if name not in self.columns:
+                raise ValueError(f"Unknown column '{name}'.")
+        for chunk in self.chunks:
+            if (start is not None and chunk['stop'] < start) or (stop is not None and chunk['start'] >= stop):
+                continue
+            index = self._load(self.index, chunk)
+            lo = 0 if start is None else np.searchsorted(index, start, 'left')
+            hi = len(index) if stop is None else np.searchsorted(index, stop, 'left')
+            if hi > lo:
+                yield {name: self._load(name, chunk)[lo:hi] for name in columns}
+
+    def read(self, start=None, stop=None, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Rows with start <= index < stop, concatenated into in-memory arrays."""
+        columns = list(self.columns) if columns is None else list(columns)
+        parts = list(self.iter_chunks(start, stop, columns))
+        if not parts:
+            return {name: np.empty((0,) + self.columns[name][1], self.columns[name][0]) for name in columns}
+        return {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+    def _load(self, name, chunk):
+        return np.load(os.path.join(self.path, name, '%06d.npy' % chunk['id']), mmap_mode='r')
+
+
+def _write_manifest(path, manifest):
+    tmp = os.path.join(path, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def record_trajectory(system, dt, steps, path: str, t0: float = 0.0, chunk_rows: int = 65536,
+                      attrs: Optional[Dict] = None) -> ColumnStore:
+    """
+    Integrate `system` like Trajectory.record, streaming the states into a store at `path` chunk by
+    chunk, so runs far larger than memory can be recorded.
+    """
+    dim = len(system.ax)
+    store = ColumnStore.create(path, {'t': 'f8', 'positions': ('f8', (2, dim)), 'velocities': ('f8', (2, dim))},
+                               't', chunk_rows, attrs)
+    positions = np.empty((min(chunk_rows, steps + 1), 2, dim))
+    velocities = np.empty_like(positions)
+    for lo in range(0, steps + 1, len(positions)):
+        n = min(len(positions), steps + 1 - lo)
+        for i in range(n):
+            if lo + i:
+                with stage('physics'):
+                    system.update(dt)
+            positions[i] = system.ax, system.bx
+            velocities[i] = system.av, system.bv
+        store.append(t=t0 + dt * np.arange(lo, lo + n), positions=positions[:n], velocities=velocities[:n])
+    store.flush()
+    return store
@@ -0,0 +1,209 @@
+"""
+Synthetic survey of a population of star-planet systems.
+
+System parameters are drawn from configurable distributions; every system is integrated over one
+orbit with OscilatingSystem (a whole chunk of systems at once, each with its own time step), and
+its transit light curve, radial velocity, Doppler line shift and astrometric track are sampled at
+the survey's observation times by Hermite interpolation of the orbit. Chunks are computed by worker
+processes and appended to a ColumnStore in order, so memory stays bounded whatever the population:
+
+    from exosim.survey import SurveyConfig, generate_survey
+    generate_survey('survey.store', SurveyConfig(systems=100_000), workers=None)
+
+Geometry follows get_orbit_position: orbits lie in the X-Y plane and the observer sits far along
++Y, tilted out of the plane by the inclination (90 degrees is edge-on). Radial velocities are
+positive when the star recedes. Astrometric tracks are the star's sky offset from the barycentre,
+in milliarcseconds.
+
+Note the integrated orbit only closes approximately after one period (the integrator is first
+order), so observations wrapping past a period pick up a small jump; raise steps_per_orbit to
+shrink it.
+"""
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from exosim.photometry import calculate_light_intensity
+from exosim.physics import G, OscilatingSystem
+from exosim.profiling import stage
+from exosim.spectroscopy import line_shift
+from exosim.store import ColumnStore
+from exosim.trajectory import hermite
+
+M_SUN, R_SUN = 1.989e30, 6.957e8
+M_EARTH, R_EARTH = 5.972e24, 6.371e6
+M_JUP, R_JUP = 1.898e27, 6.9911e7
+AU, PC, DAY = 1.495978707e11, 3.0857e16, 86400.0
+MAS = np.degrees(1) * 3600e3  # Milliarcseconds per radian
+
+# name: [kind, *args] (lists, so configs read from JSON look the same). Kinds: fixed(value),
+# uniform(lo, hi), loguniform(lo, hi), normal(mean, sigma), lognormal(mean, sigma) of the log,
+# choice(values) and isotropic() for inclinations with uniformly distributed cos(i).
+DEFAULT_DISTRIBUTIONS = {
+    'star_mass': ['uniform', 0.5 * M_SUN, 1.5 * M_SUN],
+    'star_radius': ['uniform', 0.5 * R_SUN, 1.5 * R_SUN],
+    'planet_mass': ['loguniform', 0.5 * M_EARTH, 10 * M_JUP],
+    'planet_radius': ['loguniform', 0.8 * R_EARTH, 2 * R_JUP],
+    'semi_major_axis': ['loguniform', 0.02 * AU, 1 * AU],
+    'eccentricity': ['uniform', 0.0, 0.3],
+    'periapsis_angle': ['uniform', 0.0, 2 * np.pi],
+    'inclination': ['isotropic'],
+    'phase': ['uniform', 0.0, 1.0],
+    'distance': ['uniform', 10 * PC, 200 * PC],
+}
+
+
+def sample(distributions: Dict[str, Sequence], n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    values = {}
+    for name, (kind, *args) in distributions.items():
+        if kind == 'fixed':
+            values[name] = np.full(n, float(args[0]))
+        elif kind == 'uniform':
+            values[name] = rng.uniform(args[0], args[1], n)
+        elif kind == 'loguniform':
+            values[name] = np.exp(rng.uniform(np.log(args[0]), np.log(args[1]), n))
+        elif kind == 'normal':
+            values[name] = rng.normal(args[0], args[1], n)
+        elif kind == 'lognormal':
+            values[name] = rng.lognormal(args[0], args[1], n)
+        elif kind == 'choice':
+            values[name] = rng.choice(np.asarray(args[0], dtype=float), n)
+        elif kind == 'isotropic':
+            values[name] = np.arccos(rng.uniform(0, 1, n))
+        else:
+            raise ValueError(f"Unknown distribution '{kind}' for {name}.")
+    return values
+
+
+@dataclass
+class SurveyConfig:
+    systems: int = 100_000
+    times: Optional[Sequence[float]] = None  # Observation times (s); default every 30 minutes for 90 days
+    distributions: Dict[str, Sequence] = field(default_factory=dict)  # Overrides of DEFAULT_DISTRIBUTIONS
+    noise: Dict[str, float] = field(default_factory=dict)  # Gaussian sigma for 'flux', 'rv' (m/s), 'astrometry' (mas)
+    rest_wavelength: float = 656.28  # nm, H-alpha
+    steps_per_orbit: int = 512
+    chunk: int = 256  # Systems per batch; also the store's chunk size
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.times is None:
+            self.times = np.arange(0, 90 * DAY, 1800.0)
+        self.times = np.asarray(self.times, dtype=float)
+        unknown = set(self.distributions) - set(DEFAULT_DISTRIBUTIONS)
+        if unknown:
+            raise ValueError(f"Unknown survey parameters: {', '.join(sorted(unknown))}.")
+        self.distributions = dict(DEFAULT_DISTRIBUTIONS, **self.distributions)
+
+    @property
+    def chunks(self) -> int:
+        return -(-self.systems // self.chunk)
+
+
+def simulate_chunk(config: SurveyConfig, index: int) -> Dict[str, np.ndarray]:
+    """
+    Parameters and observables of systems [index * chunk, (index + 1) * chunk). The random stream
+    depends only on the seed and the chunk index, so results don't depend on the number of workers.
+    """
+    lo = index * config.chunk
+    n = min(config.chunk, config.systems - lo)
+    rng = np.random.default_rng([config.seed, index])
+    p = sample(config.distributions, n, rng)
+
+    # Start every orbit at periapsis with the barycentre at rest; body A is the star.
+    ms, mp, a, e = p['star_mass'], p['planet_mass'], p['semi_major_axis'], p['eccentricity']
+    mu = G * (ms + mp)
+    period = 2 * np.pi * np.sqrt(a ** 3 / mu)
+    periapsis = a * (1 - e)
+    speed = np.sqrt(mu * (1 + e) / periapsis)
+    zero = np.zeros(n)
+    system = OscilatingSystem(ms, mp, periapsis, np.stack([zero, -speed * mp / (ms + mp)], -1),
+                              np.stack([zero, speed * ms / (ms + mp)], -1))
+
+    # One orbit per system, each with its own step. Momentum is conserved, so the planet's position
+    # and velocity relative to the star, (steps + 1, n, 2), determine both bodies' motion.
+    steps = config.steps_per_orbit
+    dt = period / steps
+    relative = np.empty((steps + 1, n, 2))
+    relative_v = np.empty_like(relative)
+    with stage('survey.physics'):
+        for k in range(steps + 1):
+            if k:
+                system.update(dt[:, None])
+            relative[k] = system.bx - system.ax
+            relative_v[k] = system.bv - system.av
+
+    with stage('survey.observables'):
+        # Interpolate every system at its own orbital phase of each observation time.
+        t = (config.times[None, :] + p['phase'][:, None] * period[:, None]) % period[:, None]
+        k = np.minimum((t / dt[:, None]).astype(np.int64), steps - 1)
+        rows = np.arange(n)[:, None]
+        pos, vel = hermite(relative[k, rows], relative_v[k, rows], relative[k + 1, rows], relative_v[k + 1, rows],
+                           t / dt[:, None] - k, dt[:, None])
+
+        # Rotate each orbit by its periapsis angle, then view it at its inclination. The star sits
+        # at -mp / (ms + mp) of the relative vector from the barycentre.
+        cos_w, sin_w = np.cos(p['periapsis_angle'])[:, None], np.sin(p['periapsis_angle'])[:, None]
+        cos_i, sin_i = np.cos(p['inclination'])[:, None], np.sin(p['inclination'])[:, None]
+        rel_x = pos[..., 0] * cos_w - pos[..., 1] * sin_w
+        rel_y = pos[..., 0] * sin_w + pos[..., 1] * cos_w
+        rel_vy = vel[..., 0] * sin_w + vel[..., 1] * cos_w
+        star = -(mp / (ms + mp))[:, None]
+
+        separation = np.hypot(rel_x, rel_y * cos_i)
+        flux = calculate_light_intensity(separation, rel_y * sin_i, p['star_radius'][:, None],
+                                         p['planet_radius'][:, None])
+        rv = -star * rel_vy * sin_i
+        astrometry = np.stack([rel_x, rel_y * cos_i], -1) * (star * MAS / p['distance'][:, None])[..., None]
+
+        noise = config.noise
+        if noise.get('flux'):
+            flux = flux + rng.normal(0, noise['flux'], flux.shape)
+        if noise.get('rv'):
+            rv = rv + rng.normal(0, noise['rv'], rv.shape)
+        if noise.get('astrometry'):
+            astrometry = astrometry + rng.normal(0, noise['astrometry'], astrometry.shape)
+
+    return dict(system=np.arange(lo, lo + n), period=period, **p,
+                flux=flux.astype(np.float32), rv=rv.astype(np.float32),
+                line_shift=line_shift(rv, config.rest_wavelength).astype(np.float32),
+                astrometry=astrometry.astype(np.float32))
+
+
+def generate_survey(path: str, config: SurveyConfig, workers: int | None = None, overwrite: bool = False,
+                    max_pending: Optional[int] = None) -> ColumnStore:
+    """
+    Simulate the whole population into a ColumnStore at `path`, one row per system indexed by
+    'system'. The observation times are kept in the store's attrs. Chunks run on `workers` processes
+    (None for every core, 1 for in-process) with at most max_pending (default 2 per worker) finished
+    or running chunks held at once.
+    """
+    m = len(config.times)
+    columns = {'system': 'i8', 'period': 'f8'}
+    columns.update({name: 'f8' for name in config.distributions})
+    columns.update(flux=('f4', (m,)), rv=('f4', (m,)), line_shift=('f4', (m,)), astrometry=('f4', (m, 2)))
+    attrs = dict(times=config.times.tolist(), rest_wavelength=config.rest_wavelength, seed=config.seed,
+                 distributions=config.distributions, noise=config.noise, steps_per_orbit=config.steps_per_orbit)
+    store = ColumnStore.create(path, columns, 'system', config.chunk, attrs, overwrite)
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        for index in range(config.chunks):
+            store.append(**simulate_chunk(config, index))
+    else:
+        max_pending = 2 * workers if max_pending is None else max_pending
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            for index in range(config.chunks):
+                pending.append(pool.submit(simulate_chunk, config, index))
+                if len(pending) >= max_pending:
+                    store.append(**pending.popleft().result())
+            while pending:
+                store.append(**pending.popleft().result())
+    store.flush()
+    return store
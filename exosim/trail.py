@@ -0,0 +1,59 @@
+from __future__ import annotations
+import numpy as np
+
+
+class Trail:
+    """
+    The last `length` positions of a body, kept in a fixed-size ring buffer and drawn by one artist.
+    Pushing and redrawing cost the same no matter how long the simulation has been running.
+
+    With fade=True the trail is a single scatter whose points fade out from newest to oldest,
+    otherwise a marker-only Line3D.
+    """
+
+    def __init__(self, ax, length: int, color='r', marker='o', fade: bool = False, size: float = 6, **kwargs):
+        if length < 1:
+            raise ValueError("Trail length must be at least 1.")
+        from matplotlib.colors import to_rgba
+        self.ax = ax
+        self.length = length
+        self.fade = fade
+        self._points = np.empty((length, 3))
+        self._head = 0  # Next slot to overwrite
+        self._count = 0
+        self._rgba = np.array(to_rgba(color))
+        if fade:
+            self.artist = ax.scatter([], [], [], marker=marker, s=size ** 2, depthshade=False, **kwargs)
+        else:
+            self.artist, = ax.plot([], [], [], color=color, marker=marker, ms=size, ls='', **kwargs)
+
+    def __len__(self):
+        return self._count
+
+    def push(self, position):
+        self._points[self._head] = position[:3]
+        self._head = (self._head + 1) % self.length
+        self._count = min(self._count + 1, self.length)
+
+    def clear(self):
+        self._head = self._count = 0
+
+    @property
+    def points(self) -> np.ndarray:
+        """Stored positions, oldest first."""
+        idx = (self._head - self._count + np.arange(self._count)) % self.length
+        return self._points[idx]
+
+    def refresh(self):
+        pts = self.points
+        if self.fade:
+            colors = np.tile(self._rgba, (len(pts), 1))
+            colors[:, 3] *= np.arange(1, len(pts) + 1) / max(len(pts), 1)
+            self.artist.set_offsets(pts[:, :2])
+            self.artist.set_facecolor(colors)
+            self.artist.set_edgecolor(colors)
+            self.artist.set_3d_properties(pts[:, 2], 'z')
+        else:
+            self.artist.set_data(pts[:, 0], pts[:, 1])
+            self.artist.set_3d_properties(pts[:, 2])
+        return self.artist
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import numpy as np
+
+from exosim.profiling import stage
+
+
+class Trajectory:
+    """
+    States of a two-body system sampled at every integration step.
+
+    t: (n,) times in seconds.
+    positions, velocities: (n, 2, dim) arrays; body A is index 0, body B index 1. float32 states (from
+    OscilatingSystem32) are kept as float32, anything else becomes float64.
+    """
+
+    def __init__(self, t, positions, velocities):
+        self.t = np.asarray(t, dtype=float)
+        self.positions = _state_array(positions)
+        self.velocities = _state_array(velocities)
+        self.precision = None  # PrecisionReport of the float32 check, when record() ran one
+
+    def __len__(self):
+        return len(self.t)
+
+    def __getitem__(self, index) -> Trajectory:
+        """The states in a slice, as a new Trajectory (e.g. trajectory[1:] for the states after each step)."""
+        if not isinstance(index, slice):
+            raise TypeError("Trajectories are indexed by slices; use .positions or .at() for single states.")
+        trajectory = Trajectory(self.t[index], self.positions[index], self.velocities[index])
+        trajectory.precision = self.precision
+        return trajectory
+
+    @property
+    def a(self) -> np.ndarray:
+        return self.positions[:, 0]
+
+    @property
+    def b(self) -> np.ndarray:
+        return self.positions[:, 1]
+
+    @classmethod
+    def record(cls, system, dt, steps, t0=0.0, check_steps: int = 1000) -> Trajectory:
+        """
+        Integrate `system` (anything with update(dt) and ax/bx/av/bv state) and keep every step.
+
+        float32 systems are first checked against a float64 run over their first check_steps steps
+        (see exosim.precision.check_system), which warns when the error is beyond tolerance.
+        """
+        report = None
+        if getattr(system, 'dtype', None) == np.float32 and check_steps:
+            from exosim.precision import check_system
+            report = check_system(system, dt, min(steps, check_steps))
+        a = np.asarray(system.ax)
+        positions = np.empty((steps + 1, 2) + a.shape, dtype=a.dtype)
+        velocities = np.empty_like(positions)
+        positions[0] = system.ax, system.bx
+        velocities[0] = system.av, system.bv
+        for i in range(1, steps + 1):
+            with stage('physics'):
+                system.update(dt)
+            positions[i] = system.ax, system.bx
+            velocities[i] = system.av, system.bv
+        trajectory = cls(t0 + dt * np.arange(steps + 1), positions, velocities)
+        trajectory.precision = report
+        return trajectory
+
+    def at(self, times):
+        """
+        Positions and velocities at arbitrary `times` (scalar or array, within t[0]..t[-1]), by cubic
+        Hermite interpolation between the stored steps using their velocities as derivatives. Lets
+        renderers and light curves use any frame rate or cadence without re-running the integrator.
+        Returns (positions, velocities) of shape times.shape + (2, dim).
+        """
+        times = np.asarray(times, dtype=float)
+        if len(self.t) < 2:
+            raise ValueError("Interpolation needs at least two recorded states.")
+        if times.size and (times.min() < self.t[0] or times.max() > self.t[-1]):
+            raise ValueError("Query times must lie within the recorded span [%g, %g]." % (self.t[0], self.t[-1]))
+
+        i = np.clip(np.searchsorted(self.t, times, 'right') - 1, 0, len(self.t) - 2)
+        h = self.t[i + 1] - self.t[i]
+        positions, velocities = hermite(self.positions[i], self.velocities[i], self.positions[i + 1],
+                                        self.velocities[i + 1], (times - self.t[i]) / h, h)
+        return positions.astype(self.positions.dtype, copy=False), velocities.astype(self.velocities.dtype, copy=False)
+
+    def resample(self, times) -> Trajectory:
+        """A new Trajectory holding the interpolated states at `times`, e.g. one per video frame."""
+        times = np.asarray(times, dtype=float)
+        trajectory = Trajectory(times, *self.at(times))
+        trajectory.precision = self.precision
+        return trajectory
+
+    def save(self, path: str, chunk_rows: int = 65536, overwrite: bool = False):
+        """Write to a chunked ColumnStore directory (see exosim.store)."""
+        from exosim.store import ColumnStore
+        return ColumnStore.write(path, dict(t=self.t, positions=self.positions, velocities=self.velocities),
+                                 't', chunk_rows, overwrite=overwrite)
+
+    @classmethod
+    def load(cls, path: str, start=None, stop=None) -> Trajectory:
+        """Read the states with start <= t < stop from a store written by save() or record_trajectory()."""
+        from exosim.store import ColumnStore
+        data = ColumnStore(path).read(start, stop, ['t', 'positions', 'velocities'])
+        return cls(data['t'], data['positions'], data['velocities'])
+
+
+def hermite(p0, v0, p1, v1, s, h):
+    """
+    Cubic Hermite interpolation between states (p0, v0) and (p1, v1) recorded h apart, at the fractions
+    s of the way from one to the other. s and h broadcast over the leading axes of the states.
+    Returns the interpolated (positions, velocities).
+    """
+    expand = (Ellipsis,) + (None,) * (np.ndim(p0) - np.ndim(s))
+    s, h = np.asarray(s)[expand], np.asarray(h)[expand]
+    s2, s3 = s * s, s * s * s
+    m0, m1 = v0 * h, v1 * h
+    positions = (2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * m0 + (3 * s2 - 2 * s3) * p1 + (s3 - s2) * m1
+    velocities = ((6 * s2 - 6 * s) * (p0 - p1) + (3 * s2 - 4 * s + 1) * m0 + (3 * s2 - 2 * s) * m1) / h
+    return positions, velocities
+
+
+def _state_array(values):
+    values = np.asarray(values)
+    return values if values.dtype == np.float32 else values.astype(float)
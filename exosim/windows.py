@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List
+import numpy as np
+
+from exosim.profiling import stage
+from exosim.trail import Trail
+
+if TYPE_CHECKING:
+    from mpl_toolkits.mplot3d.art3d import Line3D
+
+# pyplot is imported inside the methods, so importing this module doesn't pull in a GUI backend.
+
+
+class AnimatedWindow:
+    def __init__(self, *subplots_args, **subplots_kwargs):
+        from matplotlib import pyplot as plt
+        self.fig, self.ax = plt.subplots(*subplots_args, **subplots_kwargs)
+        self.figid = id(self.fig)
+
+    def scatter(self, points):
+        self.ax.scatter(*zip(points))
+
+    def refresh(self):
+        from matplotlib import pyplot as plt
+        if id(plt.gcf()) != self.figid:
+            raise ValueError("Window does not exist.")
+
+        with stage('window.draw'):
+            plt.draw()
+        with stage('window.pause'):
+            plt.pause(0.0001)
+
+    def clear(self):
+        self.ax.cla()
+
+
+class AnimatedWindow3D:
+    def __init__(self, ax_lim = (-5e8, 5e8)):
+        from matplotlib import pyplot as plt
+        self.fig = plt.figure()
+        self.ax = self.fig.add_subplot(111, projection='3d')
+        self.figid = id(self.fig)
+
+        self.ax.set_xlim(ax_lim)
+        self.ax.set_ylim(ax_lim)
+        self.ax.set_zlim(ax_lim)
+        self.ax.set_xlabel('X (m)')
+        self.ax.set_ylabel('Y (m)')
+        self.ax.set_zlabel('Z (m)')
+
+    def add_replottable_object(self, initial_position: np.ndarray | List, *args, **kwargs):
+        if len(initial_position) != 3:
+            raise ValueError("Initial position must be an iterable of length 3.")
+        obj_plt, = self.ax.plot([initial_position[0]], [initial_position[1]], [initial_position[2]], *args, **kwargs)
+        return obj_plt
+
+    def replot(self, obj: Line3D, position: np.ndarray | List):
+        obj.set_data([position[0]], [position[1]])
+        obj.set_3d_properties([position[2]])
+
+    def add_trail(self, length: int, color='r', marker='o', fade: bool = False, **kwargs) -> Trail:
+        return Trail(self.ax, length, color, marker, fade, **kwargs)
+
+    def refresh(self):
+        from matplotlib import pyplot as plt
+        if id(plt.gcf()) != self.figid:
+            raise ValueError("Window does not exist.")
+
+        with stage('window.pause'):
+            plt.pause(0.0001)
+
+    def clear(self):
+        self.ax.cla()
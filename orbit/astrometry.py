@@ -1,93 +1,10 @@
-from __future__ import annotations
-from typing import *
 import numpy as np
 from matplotlib import pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Line3D
-
-class AnimatedWindow:
-    def __init__(self):
-        self.fig, self.ax = plt.subplots()
-        self.ax = self.fig.gca()
-        self.figid = id(self.fig)
-
-    def scatter(self, points):
-        self.ax.scatter(*zip(points))
-
-    def refresh(self):
-        if id(plt.gcf()) != self.figid:
-            raise ValueError("Window does not exist.")
-
-        plt.draw()
-        plt.pause(0.0001)
-
-    def clear(self):
-        self.ax.cla()
-
-
-class OscilatingSystem:
-    G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
-
-    def __init__(self, ma, mb, d, a_init_v = (0, 0, 15), b_init_v = (0, 1022, 0)):
-        self.ma = ma  # The mass of body A
-        self.mb = mb  # The mass of body B
-        self.d = d  # The distance between both
-
-        self.ax, self.bx = np.array([0, 0, 0], dtype=float), np.array([d, 0, 0], dtype=float)
-        self.av, self.bv = np.array(a_init_v, dtype=float), np.array(b_init_v, dtype=float)
-        self.get_a_pos = lambda: self.ax
-        self.get_b_pos = lambda: self.bx
-
-    def gravitational_force(self):
-        r = self.bx - self.ax
-        dist = np.linalg.norm(r)
-        force = self.G * self.ma * self.mb / dist ** 2
-        direction = r / dist
-        return force * direction
-
-    def update(self, dt):
-        F_ab = self.gravitational_force()
-        F_ba = -F_ab  # act-react
-
-        # Note that F/m = accel
-        self.av += F_ab / self.ma * dt
-        self.bv += F_ba / self.mb * dt
-
-        self.ax += self.av * dt
-        self.bx += self.bv * dt
-
-
-class AnimatedWindow3D:
-    def __init__(self, ax_lim = (-5e8, 5e8)):
-        self.fig = plt.figure()
-        self.ax = self.fig.add_subplot(111, projection='3d')
-        self.figid = id(self.fig)
-
-        self.ax.set_xlim(ax_lim)
-        self.ax.set_ylim(ax_lim)
-        self.ax.set_zlim(ax_lim)
-        self.ax.set_xlabel('X (m)')
-        self.ax.set_ylabel('Y (m)')
-        self.ax.set_zlabel('Z (m)')
-
-    def add_replottable_object(self, initial_position: np.ndarray | List, *args, **kwargs):
-        if len(initial_position) != 3:
-            raise ValueError("Initial position must be an iterable of length 3.")
-        obj_plt, = self.ax.plot([initial_position[0]], [initial_position[1]], [initial_position[2]], *args, **kwargs)
-        return obj_plt
-
-    def replot(self, obj: Line3D, position: np.ndarray | List):
-        obj.set_data([position[0]], [position[1]])
-        obj.set_3d_properties([position[2]])
-
-    def refresh(self):
-        if id(plt.gcf()) != self.figid:
-            raise ValueError("Window does not exist.")
-
-        #plt.draw()
-        plt.pause(0.0001)
-
-    def clear(self):
-        self.ax.cla()
+from exosim.history import GrowingBuffer
+from exosim.live import LiveViewer, SimulationWorker
+from exosim.physics import OscilatingSystem
+from exosim.trail import Trail
+from exosim.windows import AnimatedWindow, AnimatedWindow3D
 
 
 def main_3d():
@@ -95,8 +12,8 @@ def main_3d():
     system = OscilatingSystem(5.972e24, 7.348e23, 384.4e6, [200, 0, 0], [0, 922, 0])
     dt = 10000
     steps = 10000
-    ctr = 0
     pt_count = 20
+    trail_length = 250
 
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
@@ -112,24 +29,27 @@ def main_3d():
     ax.set_xlabel('X (m)')
     ax.set_ylabel('Y (m)')
     ax.set_zlabel('Z (m)')
-
-    for _ in range(steps):
-        # Compute forces
-        system.update(dt)
-        pa, pb = system.get_a_pos(), system.get_b_pos()
-
-        # Update the plot data
+    body1_trail = Trail(ax, trail_length, 'b', '+', fade=True)
+    body2_trail = Trail(ax, trail_length, 'r', '+', fade=True)
+
+    viewer = LiveViewer(fig, max_fps=30)
+    viewer.add_artists(body1_plot, body2_plot, body1_trail.artist, body2_trail.artist)
+
+    def on_states(states):
+        for step, pa, pb in states:
+            if step % pt_count == 0:
+                body1_trail.push(pa)
+                body2_trail.push(pb)
+        _, pa, pb = states[-1]
         body1_plot.set_data([pa[0]], [pa[1]])
         body1_plot.set_3d_properties([pa[2]])
         body2_plot.set_data([pb[0]], [pb[1]])
         body2_plot.set_3d_properties([pb[2]])
-        if ctr % pt_count == 0:
-            ax.scatter(pa[0], pa[1], pa[2], 'b+')
-            ax.scatter(pb[0], pb[1], pb[2], 'r+')
-            ctr = 0
-        ctr += 1
-        # Redraw the plot with a small pause
-        plt.pause(0.00001)
+        body1_trail.refresh()
+        body2_trail.refresh()
+
+    viewer.run(SimulationWorker(system, dt, steps), on_states)
+    plt.show()
 
 
 def simple_main_3d():
@@ -137,41 +57,75 @@ def simple_main_3d():
     system = OscilatingSystem(5.972e24, 7.348e23, 384.4e6, [0, 0, 0], [-500, 1022, 0])
     dt = 8000
     steps = 10000
-    ctr = 0
     pt_count = 20
+    trail_length = 250
 
     earth = w.add_replottable_object(system.get_a_pos(), 'bo', label="Earth")
     moon = w.add_replottable_object(system.get_b_pos(), 'ro', label="Moon")
-
-    for _ in range(steps):
-        system.update(dt)
-        w.replot(earth, system.get_a_pos())
-        w.replot(moon, system.get_b_pos())
-
-        if ctr % pt_count == 0:
-            pa, pb = system.get_a_pos(), system.get_b_pos()
-            w.ax.scatter(pa[0], pa[1], pa[2], 'b+')
-            w.ax.scatter(pb[0], pb[1], pb[2], 'r+')
-            ctr = 0
-        ctr += 1
-        w.refresh()
+    earth_trail = w.add_trail(trail_length, 'b', '+', fade=True)
+    moon_trail = w.add_trail(trail_length, 'r', '+', fade=True)
+
+    viewer = LiveViewer(w.fig, max_fps=30)
+    viewer.add_artists(earth, moon, earth_trail.artist, moon_trail.artist)
+
+    def on_states(states):
+        for step, pa, pb in states:
+            if step % pt_count == 0:
+                earth_trail.push(pa)
+                moon_trail.push(pb)
+        _, pa, pb = states[-1]
+        w.replot(earth, pa)
+        w.replot(moon, pb)
+        earth_trail.refresh()
+        moon_trail.refresh()
+
+    viewer.run(SimulationWorker(system, dt, steps), on_states)
     plt.show()
 
 
-
-
-if __name__  != '__main__':
+def main_2d():
     w = AnimatedWindow()
     system = OscilatingSystem(5.972e24, 7.348e23, 384.4e6, [150, 0, 400], [0, 1022, 0])
-
     dt = 5000
     steps = 10000
-    for _ in range(steps):
-        system.update(dt)
-        ap, bp = system.get_a_pos()[:2], system.get_b_pos()[:2]
-        w.ax.scatter([ap[0]], [ap[1]], c=(0, 0, 1), marker='+')
-        w.ax.scatter([bp[0]], [bp[1]], c=(1, 0, 0), marker='+')
-        w.refresh()
-else:
+
+    # Every step's position stays on screen: each frame only draws the new points into the viewer's
+    # background, and the whole track is redrawn only when the view changes.
+    colors = (0, 0, 1), (1, 0, 0)
+    tracks = [GrowingBuffer(2, steps) for _ in colors]
+    history = [w.ax.plot([], [], color=color, marker='+', ls='')[0] for color in colors]
+    fresh = [w.ax.plot([], [], color=color, marker='+', ls='')[0] for color in colors]
+    w.ax.set_xlim(-5e8, 5e8)
+    w.ax.set_ylim(-5e8, 5e8)
+    bounds = np.array([[np.inf, np.inf], [-np.inf, -np.inf]])  # Running min and max of every point
+
+    def redraw():
+        for line, track in zip(history, tracks):
+            line.set_data(track.data[:, 0], track.data[:, 1])
+
+    viewer = LiveViewer(w.fig, max_fps=30, on_redraw=redraw)
+    viewer.add_artists(*fresh, keep=True)
+
+    def on_states(states):
+        for track, line, body in zip(tracks, fresh, (1, 2)):
+            points = np.array([state[body][:2] for state in states])
+            track.extend(points)
+            line.set_data(points[:, 0], points[:, 1])
+            bounds[0] = np.minimum(bounds[0], points.min(axis=0))
+            bounds[1] = np.maximum(bounds[1], points.max(axis=0))
+        # The barycentre drifts; widen the view (and redraw the background) when a body leaves it.
+        (lo_x, lo_y), (hi_x, hi_y) = bounds
+        (x0, x1), (y0, y1) = w.ax.get_xlim(), w.ax.get_ylim()
+        if lo_x < x0 or hi_x > x1 or lo_y < y0 or hi_y > y1:
+            w.ax.set_xlim(min(x0, lo_x) - (x1 - x0) / 2, max(x1, hi_x) + (x1 - x0) / 2)
+            w.ax.set_ylim(min(y0, lo_y) - (y1 - y0) / 2, max(y1, hi_y) + (y1 - y0) / 2)
+            viewer.invalidate()
+
+    viewer.run(SimulationWorker(system, dt, steps), on_states)
+    plt.show()
+
+
+if __name__ == '__main__':
+    #main_2d()
     #main_3d()
     simple_main_3d()
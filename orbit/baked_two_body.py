@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
+from exosim.density import DensityImage
 
 # Constants
 G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
@@ -8,6 +9,7 @@ M1 = 5.972e24  # Mass of body 1 (kg) - e.g., Earth
 M2 = 7.348e23  # Mass of body 2 (kg) - e.g., Moon
 dt = 10000  # Time step (s)
 steps = 1000  # Number of simulation steps
+density_threshold = 10**5  # Past this many points per body, draw a density image instead of lines
 
 # Initial positions (m)
 r1 = np.array([0, 0, 0], dtype=float)  # Position of body 1
@@ -18,8 +20,8 @@ v1 = np.array([0, 0, 15], dtype=float)  # Initial velocity of body 1
 v2 = np.array([0, 1022, 0], dtype=float)  # Initial velocity of body 2 (Moon's orbital speed)
 
 # Arrays to store positions for plotting
-r1_list = []
-r2_list = []
+r1_array = np.empty((steps, 3))
+r2_array = np.empty((steps, 3))
 
 # Function to calculate the gravitational force
 def gravitational_force(r1, r2):
@@ -30,10 +32,10 @@ def gravitational_force(r1, r2):
     return force * direction
 
 # Simulation loop
-for _ in range(steps):
+for i in range(steps):
     # Store positions
-    r1_list.append(r1.copy())
-    r2_list.append(r2.copy())
+    r1_array[i] = r1
+    r2_array[i] = r2
 
     # Compute forces
     F12 = gravitational_force(r1, r2)
@@ -47,22 +49,28 @@ for _ in range(steps):
     r1 += v1 * dt
     r2 += v2 * dt
 
-# Convert lists to arrays for plotting
-r1_array = np.array(r1_list)
-r2_array = np.array(r2_list)
-
 # Plotting
-fig = plt.figure()
-ax = fig.add_subplot(111, projection='3d')
-ax.plot(r1_array[:, 0], r1_array[:, 1], r1_array[:, 2], label='Body 1', color='blue')
-ax.plot(r2_array[:, 0], r2_array[:, 1], r2_array[:, 2], label='Body 2', color='red')
+if steps <= density_threshold:
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.plot(r1_array[:, 0], r1_array[:, 1], r1_array[:, 2], label='Body 1', color='blue')
+    ax.plot(r2_array[:, 0], r2_array[:, 1], r2_array[:, 2], label='Body 2', color='red')
 
-# Labels and legend
-ax.set_xlabel('X (m)')
-ax.set_ylabel('Y (m)')
-ax.set_zlabel('Z (m)')
-ax.legend()
-ax.set_title('Two-Body Orbit Simulation in 3D')
+    # Labels and legend
+    ax.set_xlabel('X (m)')
+    ax.set_ylabel('Y (m)')
+    ax.set_zlabel('Z (m)')
+    ax.legend()
+    ax.set_title('Two-Body Orbit Simulation in 3D')
+else:
+    # Too many points to draw one by one: bin both bodies into a single X-Y density image.
+    fig, ax = plt.subplots()
+    density = DensityImage.fit(np.concatenate([r1_array[::100], r2_array[::100]]), projection='xy', bins=800)
+    density.accumulate(r1_array).accumulate(r2_array)
+    density.show(ax)
+    ax.set_xlabel('X (m)')
+    ax.set_ylabel('Y (m)')
+    ax.set_title('Two-Body Orbit Density (X-Y projection)')
 
 plt.show()
 
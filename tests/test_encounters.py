@@ -0,0 +1,46 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from exosim.encounters import close_pairs
+from exosim.physics import NBodySystem, OscilatingSystem
+
+
+def brute_force(positions, distance, radii=None):
+    pairs = set()
+    for i, j in itertools.combinations(range(len(positions)), 2):
+        limit = distance if radii is None else max(distance, radii[i] + radii[j])
+        if np.linalg.norm(positions[i] - positions[j]) < limit:
+            pairs.add((i, j))
+    return pairs
+
+
+@pytest.mark.parametrize('dims', [2, 3])
+@pytest.mark.parametrize('with_radii', [False, True])
+def test_close_pairs_match_brute_force(dims, with_radii):
+    rng = np.random.default_rng(dims)
+    positions = rng.uniform(-10, 10, (400, dims))
+    radii = rng.uniform(0, 0.6, 400) if with_radii else None
+    i, j, separation = close_pairs(positions, 0.5, radii)
+    assert set(zip(i.tolist(), j.tolist())) == brute_force(positions, 0.5, radii)
+    assert np.all(i < j)
+    assert separation == pytest.approx(np.linalg.norm(positions[i] - positions[j], axis=-1))
+
+
+def test_overlap_at_start_is_reported_and_merged():
+    system = NBodySystem([1e20, 2e20, 1e20], [[0, 0], [1, 0], [100, 0]], [[0, 0], [0, 0], [0, 1]],
+                         radii=[1, 1, 1], merge=True)
+    assert [(e.a, e.b, e.kind, e.merged) for e in system.events] == [(0, 1, 'collision', True)]
+    assert system.ids.tolist() == [0, 2] and system.masses[0] == 3e20
+
+
+def test_coincident_bodies_raise_instead_of_nan():
+    system = NBodySystem([1.0, 1.0, 1.0], [[0, 0], [0, 0], [5, 0]], np.zeros((3, 2)))
+    with pytest.raises(ValueError, match="Bodies 0 and 1 coincide"):
+        system.update(1.0)
+    softened = NBodySystem([1.0, 1.0], [[0, 0], [0, 0]], np.zeros((2, 2)), softening=0.1)
+    softened.update(1.0)
+    assert np.isfinite(softened.x).all()
+    with pytest.raises(ValueError):
+        OscilatingSystem(1.0, 1.0, 0.0).update(1.0)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from exosim.flux import FluxEngine
+from exosim.photometry import calculate_light_intensity
+
+
+def single(x, radius):
+    return np.stack([x, np.zeros_like(x), np.full_like(x, radius)], -1)[:, None]
+
+
+def test_uniform_disk_matches_analytic_transit():
+    x = np.linspace(-1.3, 1.3, 101)
+    engine = FluxEngine(128, refine=8)
+    expected = calculate_light_intensity(x, np.ones_like(x), 1.0, 0.1)
+    assert engine.flux(single(x, 0.1)) == pytest.approx(expected, abs=5e-5)
+
+
+def test_overlapping_occulters_count_once():
+    x = np.linspace(-0.5, 0.5, 11)
+    engine = FluxEngine(64)
+    both = np.concatenate([single(x, 0.1), single(x, 0.1)], axis=1)
+    assert engine.flux(both) == pytest.approx(engine.flux(single(x, 0.1)), abs=1e-12)
+
+
+def test_off_disk_and_hidden_occulters_leave_full_flux():
+    engine = FluxEngine(64, limb_darkening=(0.4, 0.2))
+    occulters = single(np.array([-2.0, 0.0, 2.0]), 0.1)
+    assert engine.flux(occulters, visible=np.array([[True], [False], [True]])) == pytest.approx(1.0)
+
+
+def test_spot_dims_by_contrast_times_area():
+    engine = FluxEngine(128)
+    spot = np.array([[0.0, 0.0, 0.2, 0.5]])
+    assert engine.flux(single(np.array([3.0]), 0.1), spots=spot) == pytest.approx(1 - 0.5 * 0.2 ** 2, abs=1e-4)
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+
+from exosim.frame_cache import FrameCache, scene_key
+
+
+def frame(seed):
+    # Random bytes barely compress, so every stored frame costs about the same.
+    return np.random.default_rng(seed).integers(0, 256, 4096, dtype=np.uint8).tobytes()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = FrameCache(None, max_bytes=14000)  # Three frames fit under the 90% eviction target
+    for i in range(3):
+        cache.put(i, frame(i))
+    assert cache.get(0) == frame(0)  # Now 1 is the least recently used
+    cache.put(3, frame(3))
+    assert cache.get(1) is None
+    assert [cache.get(i) for i in (0, 2, 3)] == [frame(0), frame(2), frame(3)]
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = FrameCache(str(tmp_path), max_bytes=14000)  # Three frames fit under the 90% eviction target
+    for i in range(3):
+        cache.put(str(i), frame(i))
+        os.utime(cache._path(str(i)), (1000 + i, 1000 + i))
+    cache.put('3', frame(3))
+    assert cache.get('0') is None
+    assert [cache.get(k) for k in '123'] == [frame(1), frame(2), frame(3)]
+    assert FrameCache(str(tmp_path)).get('3') == frame(3)  # Persists between instances
+
+
+def test_keys_separate_dpi_and_transparency():
+    keys = {FrameCache.key('scene', 0, (640, 480), 100), FrameCache.key('scene', 0, (640, 480), 200),
+            FrameCache.key('scene', 0, (640, 480), 100, transparent=True), FrameCache.key('scene', 1, (640, 480), 100)}
+    assert len(keys) == 4
+
+
+def test_scene_key_follows_drawing_code():
+    def draw():
+        return 1
+
+    def redraw():
+        return 2
+
+    assert scene_key(draw, np.arange(3)) == scene_key(draw, np.arange(3))
+    assert scene_key(draw, np.arange(3)) != scene_key(redraw, np.arange(3))
+    assert scene_key(draw, np.arange(3)) != scene_key(draw, np.arange(4))
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from exosim.photometry import calculate_light_intensity, get_orbit_position, orbit_light_curve
+
+# (star radius, planet radius) pairs whose contact distances used to round out of acos/sqrt's domain.
+RADII = [(1.0, 0.1), (1.0, 0.3), (3.0, 0.9492307692307692), (6.957e8, 6.9911e7)]
+
+
+@pytest.mark.parametrize('sun_radius, exp_radius', RADII)
+def test_first_contact(sun_radius, exp_radius):
+    x = sun_radius + exp_radius
+    assert calculate_light_intensity(x, 1.0, sun_radius, exp_radius) == pytest.approx(1.0)
+    for dtype in (np.float64, np.float32):
+        intensity = calculate_light_intensity(np.array([x]), np.array([1.0]), sun_radius, exp_radius, dtype)
+        assert intensity[0] == pytest.approx(1.0, abs=1e-6)
+
+
+@pytest.mark.parametrize('sun_radius, exp_radius', RADII)
+def test_second_contact(sun_radius, exp_radius):
+    # At and just outside second contact the whole planet disc blocks the star.
+    expected = 1 - (exp_radius / sun_radius) ** 2
+    for x in (sun_radius - exp_radius, float(np.nextafter(sun_radius - exp_radius, np.inf))):
+        assert calculate_light_intensity(x, 1.0, sun_radius, exp_radius) == pytest.approx(expected)
+        for dtype in (np.float64, np.float32):
+            intensity = calculate_light_intensity(np.array([x]), np.array([1.0]), sun_radius, exp_radius, dtype)
+            assert intensity[0] == pytest.approx(expected, abs=1e-6)
+
+
+def full_light_curve(t, orbit_time, distance, sun_radius, exp_radius, dtype=np.float64):
+    x, y = get_orbit_position(np.asarray(t, dtype=float).ravel(), orbit_time, distance)
+    return calculate_light_intensity(x, y, sun_radius, exp_radius, dtype).reshape(np.shape(t))
+
+
+@pytest.mark.parametrize('distance', [1.5e11, 8e8])  # The second orbit overlaps the disk half the time
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_orbit_light_curve_matches_full_evaluation(distance, dtype):
+    args = (3.15e7, distance, 6.957e8, 6.9911e7)
+    t = np.arange(-1e6, 8e7, 600.0)
+    assert np.array_equal(orbit_light_curve(t, *args, dtype=dtype), full_light_curve(t, *args, dtype=dtype))
+
+
+def test_orbit_light_curve_unsorted_times():
+    args = (3.15e7, 1.5e11, 6.957e8, 6.9911e7)
+    t = np.random.default_rng(0).uniform(0, 1e8, (300, 400))
+    curve = orbit_light_curve(t, *args)
+    assert curve.shape == t.shape and (curve < 1).any()
+    assert np.array_equal(curve, full_light_curve(t, *args))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from exosim.physics import OscilatingSystem
+from exosim.store import ColumnStore, record_trajectory
+from exosim.trajectory import Trajectory
+
+
+def test_round_trip_and_range_query(tmp_path):
+    t = np.arange(1000) * 0.5
+    positions = np.random.default_rng(0).normal(size=(1000, 2, 3))
+    ColumnStore.write(str(tmp_path / 'run.store'), dict(t=t, positions=positions), chunk_rows=64)
+
+    store = ColumnStore(str(tmp_path / 'run.store'))
+    assert len(store) == 1000 and store.span == (0.0, 499.5)
+    data = store.read()
+    assert np.array_equal(data['t'], t) and np.array_equal(data['positions'], positions)
+
+    part = store.read(100.25, 300, ['positions'])
+    inside = (t >= 100.25) & (t < 300)
+    assert np.array_equal(part['positions'], positions[inside])
+    assert store.read(600, 700)['t'].shape == (0,)
+
+
+def test_append_copies_buffered_rows(tmp_path):
+    store = ColumnStore.create(str(tmp_path / 'run.store'), {'t': 'i8'}, chunk_rows=8)
+    buffer = np.arange(5)
+    store.append(t=buffer)
+    buffer[:] = -1  # The caller reuses its buffer before the rows are flushed
+    store.append(t=np.arange(5, 8))
+    store.flush()
+    assert ColumnStore(str(tmp_path / 'run.store')).read()['t'].tolist() == list(range(8))
+
+
+def test_append_rejects_decreasing_index(tmp_path):
+    store = ColumnStore.create(str(tmp_path / 'run.store'), {'t': 'f8'})
+    store.append(t=[1.0, 2.0])
+    with pytest.raises(ValueError):
+        store.append(t=[1.5])
+
+
+def test_record_trajectory_matches_in_memory_record(tmp_path):
+    def system():
+        return OscilatingSystem(5.972e24, 7.348e23, 384.4e6, [0, 0, 15], [0, 1022, 0])
+
+    record_trajectory(system(), 100, 500, str(tmp_path / 'run.store'), chunk_rows=64)
+    stored = Trajectory.load(str(tmp_path / 'run.store'))
+    expected = Trajectory.record(system(), 100, 500)
+    assert np.array_equal(stored.t, expected.t)
+    assert np.array_equal(stored.positions, expected.positions)
+    assert np.array_equal(stored.velocities, expected.velocities)
@@ -1,7 +1,7 @@
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import time
+from exosim.photometry import get_orbit_position, calculate_light_intensity
 
 
 # Parameters
@@ -16,36 +16,6 @@ framecount = framerate*orbit_time*orbit_count
 dt = 1/30
 
 
-# Calculate exoplanet orbit path
-def get_orbit_position(t):
-    angle = 2 * np.pi * (t % orbit_time) / orbit_time
-    x = sun_exp_distance * np.cos(angle-np.pi/2)
-    y = sun_exp_distance * np.sin(angle-np.pi/2)
-    return x, y
-
-
-def calculate_light_intensity(x, y):
-    # Calculate the distance between the sun and the exoplanet centers
-    if abs(x)>(sun_radius+exp_radius) or y<0:
-        # No overlap, full light intensity
-        return 1.0
-    elif abs(x)<=abs(sun_radius-exp_radius):
-        # Full overlap (exoplanet completely covers part of the sun)
-        overlap_area = np.pi * min(sun_radius, exp_radius) ** 2
-    else:
-        # Partial overlap, calculate using circle overlap formula
-        dist_centers = abs(x)
-        d1 = (sun_radius**2 - exp_radius**2 + dist_centers**2)/(2*dist_centers)
-        d2 = dist_centers - d1
-
-        left_side = sun_radius**2*np.arccos(d1/sun_radius) - d1*np.sqrt(sun_radius**2 - d1**2)
-        right_side = exp_radius**2*np.arccos(d2/exp_radius) - d2*np.sqrt(exp_radius**2 - d2**2)
-        overlap_area = left_side + right_side
-
-    # Calculate intensity as remaining light after overlap
-    return 1 - overlap_area / (np.pi * sun_radius ** 2)
-
-
 # Prepare plot
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(6, 10))
 ax1.set_aspect('equal', 'box')
@@ -62,7 +32,7 @@ ax1.add_patch(exp_circle)
 intensity_line, = ax2.plot([], [], color='orange')
 
 # Initialize light intensity data list
-light_intensities = [calculate_light_intensity(*get_orbit_position(0))]
+light_intensities = [calculate_light_intensity(*get_orbit_position(0, orbit_time, sun_exp_distance), sun_radius, exp_radius)]
 
 
 # Update function for animation
@@ -82,11 +52,11 @@ while True:
     t += dt
     true_t += dt
     # Update exoplanet position
-    x, y = get_orbit_position(t)
+    x, y = get_orbit_position(t, orbit_time, sun_exp_distance)
     exp_circle.set_center((x, y))
 
     # Update light intensity
-    intensity = calculate_light_intensity(x, y)
+    intensity = calculate_light_intensity(x, y, sun_radius, exp_radius)
     light_intensities.append(intensity)
 
     # Update intensity plot with correct array shapes